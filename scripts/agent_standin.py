@@ -0,0 +1,82 @@
+# scripts/agent_standin.py  (local OpenAI-compatible stand-in + AgentService smoke check)
+import argparse, asyncio, json, time
+from loguru import logger
+from src.agent.service import AgentConfig, AgentService
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, delay_s: float, counter: dict):
+    """
+    Minimal POST /v1/chat/completions. Replies "echo: <last user message>".
+    A prompt starting with "sleep:<seconds>" overrides the response delay.
+    """
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = 0
+        for line in head.decode().split("\r\n")[1:]:
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        body = json.loads(await reader.readexactly(length)) if length else {}
+        counter["requests"] += 1
+        prompt = body.get("messages", [{}])[-1].get("content", "")
+        delay = float(prompt.split(":", 1)[1].split()[0]) if prompt.startswith("sleep:") else delay_s
+        await asyncio.sleep(delay)
+        payload = json.dumps({
+            "id": f"standin-{counter['requests']}",
+            "object": "chat.completion",
+            "model": body.get("model", ""),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": f"echo: {prompt}"}}],
+        }).encode()
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                     + f"Content-Length: {len(payload)}\r\n\r\n".encode() + payload)
+        await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+async def start_standin(host: str = "127.0.0.1", port: int = 0, delay_s: float = 0.05):
+    """Start the stand-in server. Returns (server, url, counter)."""
+    counter = {"requests": 0}
+    server = await asyncio.start_server(lambda r, w: _handle(r, w, delay_s, counter), host, port)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://{host}:{port}/v1/chat/completions", counter
+
+async def smoke(delay_s: float):
+    server, url, counter = await start_standin(delay_s=delay_s)
+    cfg = AgentConfig(url=url, max_concurrency=2, budget_s=1.0)
+    async with server, AgentService(cfg) as agent:
+        # identical in-flight prompts coalesce into one request
+        outs = await asyncio.gather(*(agent.ask("state?", default="FLAT") for _ in range(10)))
+        assert set(outs) == {"echo: state?"} and counter["requests"] == 1, (outs, counter)
+        # cache hit: no new request
+        assert await agent.ask("state?", default="FLAT") == "echo: state?" and counter["requests"] == 1
+        # over budget -> default, request finishes in the background and fills the cache
+        t0 = time.perf_counter()
+        assert await agent.ask("sleep:0.5 slow", default="FLAT", budget_s=0.1) == "FLAT"
+        assert time.perf_counter() - t0 < 0.3
+        await asyncio.sleep(0.6)
+        assert await agent.ask("sleep:0.5 slow", default="FLAT", budget_s=0.1) == "echo: sleep:0.5 slow"
+        # bounded concurrency: 6 distinct prompts, 2 at a time
+        t0 = time.perf_counter()
+        await asyncio.gather(*(agent.ask(f"sleep:0.2 p{i}", default="FLAT") for i in range(6)))
+        assert time.perf_counter() - t0 >= 0.55
+        logger.info(f"Stand-in OK | requests={counter['requests']} stats={agent.stats}")
+
+def main():
+    ap = argparse.ArgumentParser(description="Local OpenAI-compatible stand-in for the agent service")
+    ap.add_argument("--serve", action="store_true", help="Just serve until Ctrl-C (default: run smoke check)")
+    ap.add_argument("--port", type=int, default=8089)
+    ap.add_argument("--delay", type=float, default=0.05, help="Response delay in seconds")
+    args = ap.parse_args()
+
+    async def serve():
+        server, url, _ = await start_standin(port=args.port, delay_s=args.delay)
+        logger.info(f"Serving stand-in at {url}")
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(serve() if args.serve else smoke(args.delay))
+
+if __name__ == "__main__":
+    main()
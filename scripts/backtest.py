@@ -1,8 +1,18 @@
 import argparse, json, pandas as pd
 from loguru import logger
-from src.strategies.ema_atr import EMAATRParams, backtest
+from src.execution.feeds import ParquetBarFeed
+from src.strategies.ema_atr import EMAATRParams, backtest_feed, backtest_signals
 
-def main():
+def _strategy(name: str):
+    """Feature-graph strategy traded through the same core (None = the core's own EMA cross)."""
+    from src.strategies import features
+    if name == "donchian":
+        return features.donchian_breakout()
+    if name == "rsi":
+        return features.rsi_reversion()
+    return None
+
+def main(argv=None):
     ap = argparse.ArgumentParser(description="EMA crossover + ATR stop backtest")
     ap.add_argument("--parquet", required=True, help="Path to {SYMBOL}_{TF}.parquet")
     ap.add_argument("--fast", type=int, default=20)
@@ -10,12 +20,15 @@ def main():
     ap.add_argument("--atr", type=int, default=14)
     ap.add_argument("--atr_mult", type=float, default=2.0)
     ap.add_argument("--fee_bps", type=float, default=1.0)
-    args = ap.parse_args()
+    ap.add_argument("--warmup", type=int, default=None,
+                    help="Bars before trading (default: max(fast, slow) + atr + 2, same as the paper engine)")
+    ap.add_argument("--strategy", choices=["ema_atr", "donchian", "rsi"], default="ema_atr",
+                    help="Entry/exit signals; fills, fees and the ATR stop always follow the EMA+ATR core")
+    ap.add_argument("--mc", type=int, default=0, help="Monte Carlo resamples for robustness CIs (0 = off)")
+    ap.add_argument("--seed", type=int, default=None)
+    args = ap.parse_args(argv)
 
-    df = pd.read_parquet(args.parquet)
-    # ensure datetime
-    if df["time"].dtype != "datetime64[ns, UTC]":
-        df["time"] = pd.to_datetime(df["time"], utc=True)
+    feed = ParquetBarFeed(args.parquet)
 
     p = EMAATRParams(
         fast=args.fast,
@@ -23,8 +36,14 @@ def main():
         atr_period=args.atr,
         atr_mult=args.atr_mult,
         fee_bps=args.fee_bps,
+        warmup_bars=args.warmup,
     )
-    res = backtest(df, p)
+    strategy = _strategy(args.strategy)
+    if strategy is None:
+        res = backtest_feed(feed, p)
+    else:
+        from src.strategies.features import FeatureSet
+        res = backtest_signals(strategy, FeatureSet(feed.cols), feed, p)
     logger.info("Summary:\n" + json.dumps(res["summary"], indent=2))
     # Show last 5 trades
     last_trades = res["trades"][-5:]
@@ -41,5 +60,10 @@ def main():
     else:
         logger.info("No trades triggered with these parameters.")
 
+    if args.mc:
+        from src.strategies.robustness import robustness
+        report = robustness(res, n_resamples=args.mc, seed=args.seed)
+        logger.info("Robustness:\n" + json.dumps(report, indent=2))
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
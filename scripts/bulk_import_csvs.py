@@ -1,4 +1,4 @@
-import re, sys, asyncio
+import argparse, re, sys
 from pathlib import Path
 from loguru import logger
 from src.data.csv_importer import import_ohlcvt_csv
@@ -20,7 +20,7 @@ def infer(symbol_fn: str):
         return None
     return sym.upper(), tf
 
-def main(root="data/raw", out="data/db"):
+def import_all(root="data/raw", out="data/db"):
     rootp = Path(root)
     files = sorted([p for p in rootp.glob("*.csv")])
     if not files:
@@ -40,5 +40,12 @@ def main(root="data/raw", out="data/db"):
             logger.exception(f"Failed to import {f.name}: {e}")
     logger.info(f"Imported {ok} files into {out}")
 
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Import every Kraken OHLCVT CSV in a folder ({SYMBOL}_{MINUTES}.csv)")
+    ap.add_argument("--root", default="data/raw", help="Folder with CSVs (default: data/raw)")
+    ap.add_argument("--out", default="data/db", help="Output dir (default: data/db)")
+    args = ap.parse_args(argv)
+    import_all(args.root, args.out)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,52 @@
+# scripts/import_budget.py  (import-time budget check for `python -m src`)
+import argparse, subprocess, sys
+
+# target -> (budget ms, top-level packages that must NOT be imported)
+BUDGETS = {
+    "cli":         (60,  {"pandas", "numpy", "pyarrow", "httpx", "websockets", "loguru", "pydantic", "dotenv"}),
+    "instruments": (400, {"pandas", "numpy", "pyarrow", "websockets", "pydantic", "dotenv"}),
+    "import":      (900, {"httpx", "websockets", "pydantic", "dotenv"}),
+    "bulk-import": (900, {"httpx", "websockets", "pydantic", "dotenv"}),
+    "trades":      (900, {"httpx", "websockets", "pydantic", "dotenv"}),
+    "backtest":    (900, {"httpx", "websockets", "pydantic", "dotenv"}),
+    "paper":       (300, {"pandas", "numpy", "pyarrow", "httpx", "pydantic", "dotenv"}),
+}
+
+def measure(target: str):
+    """
+    Import the CLI (and the subcommand module unless target == "cli") in a fresh
+    interpreter under `-X importtime`. Returns (total ms, set of top-level packages).
+    """
+    code = "import src.__main__ as m" + ("" if target == "cli" else f"; m.load({target!r})")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, check=True)
+    total_us, packages = 0, set()
+    for line in proc.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name[1:].startswith(" "):  # depth 0: cumulative covers its children
+            total_us += int(cumulative)
+        packages.add(name.strip().split(".")[0])
+    return total_us / 1000.0, packages
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Check `python -X importtime` budgets for the CLI and its subcommands")
+    ap.add_argument("targets", nargs="*", default=list(BUDGETS), help=f"Subset of {list(BUDGETS)}")
+    ap.add_argument("--scale", type=float, default=1.0, help="Multiply budgets (slow machines / CI)")
+    args = ap.parse_args(argv)
+
+    failed = False
+    for target in args.targets:
+        budget_ms, forbidden = BUDGETS[target]
+        ms, packages = measure(target)
+        leaked = sorted(forbidden & packages)
+        ok = ms <= budget_ms * args.scale and not leaked
+        failed |= not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {target:<12} {ms:7.1f} ms (budget {budget_ms * args.scale:.0f} ms)"
+              + (f" imports {leaked}" if leaked else ""))
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+import argparse
+from src.data.trades_to_bars import import_trades_csv
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Build OHLCV+VWAP+trades bars from a Kraken trade history CSV")
+    ap.add_argument("--path", required=True, help="Trade CSV (timestamp, price, volume)")
+    ap.add_argument("--symbol", required=True, help="Symbol label to store, e.g. XBTUSD")
+    ap.add_argument("--bars", nargs="+", default=["1m"], help="Bar specs, e.g. 1s 10s 1m 1h vol100 (default: 1m)")
+    ap.add_argument("--out", default="data/db", help="Output dir (default: data/db)")
+    ap.add_argument("--chunksize", type=int, default=5_000_000, help="Trades per chunk (bounds memory)")
+    args = ap.parse_args(argv)
+
+    for path in import_trades_csv(args.path, args.symbol, args.bars, args.out, args.chunksize).values():
+        print(path)
+
+if __name__ == "__main__":
+    main()
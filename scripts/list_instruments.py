@@ -1,8 +1,8 @@
-import asyncio
+import argparse, asyncio
 from loguru import logger
 from src.exchange.kraken_futures_rest import fetch_instruments, filter_tradeable_perpetuals
 
-async def main():
+async def run():
     raw = await fetch_instruments()
     perps = filter_tradeable_perpetuals(raw)
     # Show a compact preview
@@ -14,5 +14,10 @@ async def main():
         lot  = inst.get('contractSize') or inst.get('contract_size') or inst.get('quantityIncrement')
         logger.info(f"{symbol} | tick={tick} | lot={lot}")
 
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="List tradeable Kraken Futures perpetuals")
+    ap.parse_args(argv)
+    asyncio.run(run())
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    main()
\ No newline at end of file
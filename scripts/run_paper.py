@@ -1,7 +1,7 @@
-import asyncio, tomllib
+import argparse, asyncio, tomllib
 from loguru import logger
 from src.execution.paper_engine import PaperEngine, EngineConfig
-from src.strategies.ema_atr import EMAATRParams
+from src.strategies.params import EMAATRParams
 
 def load_cfg(path="configs/config.toml") -> EngineConfig:
     with open(path, "rb") as f:
@@ -16,6 +16,7 @@ def load_cfg(path="configs/config.toml") -> EngineConfig:
         atr_period=int(strat["atr_period"]),
         atr_mult=float(strat["atr_mult"]),
         fee_bps=float(strat["fee_bps"]),
+        warmup_bars=strat.get("warmup_bars"),
     )
     return EngineConfig(
         products=products,
@@ -25,13 +26,37 @@ def load_cfg(path="configs/config.toml") -> EngineConfig:
         trades_csv=run["trades_csv"],
         params=params,
         daily_loss_limit_pct=float(risk["daily_loss_limit_pct"]),
+        shm_bars=run.get("shm_bars", ""),
+        prime_dir=run.get("prime_dir", ""),
     )
 
-async def main():
-    cfg = load_cfg()
+async def run(cfg: EngineConfig):
     logger.info(f"Starting Paper Engine | products={cfg.products} target_tf={cfg.target_tf}")
     engine = PaperEngine(cfg)
     await engine.run()
 
+async def all_perpetuals() -> list:
+    from src.exchange.kraken_futures_rest import fetch_instruments, filter_tradeable_perpetuals
+    perps = filter_tradeable_perpetuals(await fetch_instruments())
+    return [inst.get("symbol") or inst.get("product_id") for inst in perps]
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run the paper trading engine")
+    ap.add_argument("--config", default="configs/config.toml", help="TOML config (default: configs/config.toml)")
+    ap.add_argument("--shards", type=int, default=1,
+                    help="Worker processes; >1 (or 0 = one per core) runs the sharded supervisor")
+    ap.add_argument("--all-perpetuals", action="store_true",
+                    help="Trade every tradeable perpetual instead of [symbols].products")
+    args = ap.parse_args(argv)
+
+    cfg = load_cfg(args.config)
+    if args.all_perpetuals:
+        cfg.products = asyncio.run(all_perpetuals())
+    if args.shards == 1:
+        asyncio.run(run(cfg))
+        return
+    from src.execution.supervisor import ShardSupervisor
+    ShardSupervisor(cfg, shards=args.shards or None).run()
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    main()
\ No newline at end of file
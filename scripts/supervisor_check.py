@@ -0,0 +1,64 @@
+# scripts/supervisor_check.py  (ShardSupervisor / PaperEngine portfolio risk check with stub workers)
+import argparse, tempfile, time
+from loguru import logger
+from src.execution.core import Fill
+from src.execution.paper_engine import EngineConfig, PaperEngine
+from src.execution.supervisor import ShardSupervisor
+from src.strategies.params import EMAATRParams
+
+T0 = 1_700_000_000  # any UTC timestamp; all stub fills land on one day
+
+def _entry_worker(shard_id: int, cfg: EngineConfig, conn):
+    """Stub shard: every product enters long at once (paying the entry fee), then idles."""
+    equity = 1.0 - cfg.params.fee_bps / 10000.0
+    for p in cfg.products:
+        conn.send(("fill", Fill(T0, p, "BUY", 100.0, equity, "signal")))
+        conn.send(("bar", p, T0, equity))
+    try:
+        while True:
+            conn.recv()  # halt / resume: nothing to flatten in the stub
+    except EOFError:
+        pass
+
+class _StubSupervisor(ShardSupervisor):
+    worker = staticmethod(_entry_worker)
+
+def _config(n_products: int, log_dir: str) -> EngineConfig:
+    return EngineConfig(products=[f"PF_STUB{i}USD" for i in range(n_products)], base_tf="1m", target_tf="1h",
+                        log_dir=log_dir, trades_csv=f"{log_dir}/trades.csv", params=EMAATRParams())
+
+def check(n_products: int, shards: int):
+    """N simultaneous entries cost ~fee_bps of an equal-weight portfolio and must not trip the daily limit."""
+    with tempfile.TemporaryDirectory() as d:
+        cfg = _config(n_products, d)
+        fee = cfg.params.fee_bps / 10000.0
+
+        engine = PaperEngine(cfg)
+        for core in engine.cores.values():
+            core._buy(T0, 100.0)
+        assert abs(engine._portfolio_equity() - (1.0 - fee)) < 1e-12, engine._portfolio_equity()
+
+        sup = _StubSupervisor(cfg, shards=shards)
+        sup.start()
+        try:
+            deadline = time.monotonic() + 30
+            while any(e == 1.0 for e in sup._live.values()) and time.monotonic() < deadline:
+                sup.poll(timeout=0.1)
+        finally:
+            sup.stop()
+        assert all(e < 1.0 for e in sup._live.values()), "not every stub entry arrived"
+        assert abs(sup._equity - (1.0 - fee)) < 1e-12, sup._equity
+        assert not sup._paused, "daily loss limit tripped by entry fees"
+        print(f"ok   {n_products} entries over {len(sup.groups)} shards: equity {sup._equity:.6f} "
+              f"(product-of-equities would be {(1.0 - fee) ** n_products:.6f}), limit not tripped")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Check portfolio equity / daily loss limit with stub shard workers")
+    ap.add_argument("--products", type=int, default=300)
+    ap.add_argument("--shards", type=int, default=4)
+    args = ap.parse_args(argv)
+    logger.remove()  # per-fill INFO logs would drown the result
+    check(args.products, args.shards)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# src/__main__.py  (unified CLI: python -m src <command> [args])
+"""
+Single entry point for the repo's scripts. Only the stdlib is imported up
+front; each subcommand's module (and pandas/httpx/websockets/... with it) is
+imported when that subcommand runs.
+"""
+import importlib, sys
+
+# command -> (module with main(argv), one-line help)
+COMMANDS = {
+    "backtest":    ("scripts.backtest", "EMA crossover + ATR stop backtest on a Parquet file"),
+    "import":      ("scripts.import_ohlc_csv", "Import one Kraken OHLCVT CSV to Parquet"),
+    "bulk-import": ("scripts.bulk_import_csvs", "Import every OHLCVT CSV in a folder"),
+    "trades":      ("scripts.import_trades", "Build bars (1s, 1m, vol100, ...) from a Kraken trade history CSV"),
+    "paper":       ("scripts.run_paper", "Run the paper trading engine"),
+    "instruments": ("scripts.list_instruments", "List tradeable Kraken Futures perpetuals"),
+}
+
+def load(command: str):
+    """Import and return the module implementing `command`."""
+    return importlib.import_module(COMMANDS[command][0])
+
+def usage() -> str:
+    lines = ["usage: python -m src <command> [args]", "", "commands:"]
+    lines += [f"  {name:<12} {help_}" for name, (_, help_) in COMMANDS.items()]
+    lines += ["", "Run `python -m src <command> -h` for command options."]
+    return "\n".join(lines)
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"unknown command: {command}\n\n{usage()}", file=sys.stderr)
+        return 2
+    sys.argv[0] = f"python -m src {command}"  # argparse prog in subcommand help
+    load(command).main(rest)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,11 @@
 # src/agent/groq_client.py  (OpenAI-compatible Groq endpoint)
-import httpx, asyncio
-from src.utils.config import settings
+import httpx
+from src.utils.config import get_settings
 
 GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"  # Groq supports OpenAI-style API
 
 async def groq_hello():
+    settings = get_settings()
     async with httpx.AsyncClient(timeout=30.0, headers={
         "Authorization": f"Bearer {settings.groq_api_key}",
         "Content-Type": "application/json"
@@ -0,0 +1,168 @@
+# src/agent/service.py  (LLM calls off the trading path)
+import asyncio, hashlib, json, time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+import httpx
+from loguru import logger
+
+from src.agent.groq_client import GROQ_URL
+
+@dataclass
+class AgentConfig:
+    url: str = GROQ_URL              # any OpenAI-compatible /chat/completions endpoint
+    api_key: str = ""
+    model: str = "openai/gpt-oss-20b"
+    temperature: float = 0.0
+    max_concurrency: int = 4         # in-flight HTTP requests
+    budget_s: float = 2.0            # default per-call latency budget
+    request_timeout_s: float = 30.0  # hard cap on the HTTP call itself
+    cache_size: int = 1024
+    cache_ttl_s: float = 300.0
+
+class TTLCache:
+    """Small LRU cache with per-entry expiry."""
+    def __init__(self, maxsize: int, ttl_s: float):
+        self.maxsize = maxsize
+        self.ttl_s = ttl_s
+        self._data: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires, value = item
+        if expires < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: str):
+        self._data[key] = (time.monotonic() + self.ttl_s, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+def prompt_key(model: str, messages: list, temperature: float) -> str:
+    raw = json.dumps([model, messages, temperature], separators=(",", ":"), sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+def _messages(prompt: str, system: Optional[str]) -> list:
+    return ([{"role": "system", "content": system}] if system else []) + [{"role": "user", "content": prompt}]
+
+class AgentService:
+    """
+    Runs LLM requests off the trading path.
+
+    - one pooled `httpx.AsyncClient` for all calls
+    - at most `max_concurrency` requests in flight (semaphore)
+    - responses cached by prompt hash (LRU + TTL)
+    - identical prompts already in flight share one request
+    - `ask()` waits at most `budget_s`; past that it returns the caller's
+      default while the request keeps running and fills the cache
+
+    Use as `async with AgentService(cfg) as agent: ...`.
+    """
+    def __init__(self, cfg: AgentConfig):
+        self.cfg = cfg
+        self.cache = TTLCache(cfg.cache_size, cfg.cache_ttl_s)
+        self._sem = asyncio.Semaphore(cfg.max_concurrency)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "fallbacks": 0, "errors": 0}
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def start(self):
+        if self._client is None:
+            headers = {"Content-Type": "application/json"}
+            if self.cfg.api_key:
+                headers["Authorization"] = f"Bearer {self.cfg.api_key}"
+            limits = httpx.Limits(max_connections=self.cfg.max_concurrency)
+            self._client = httpx.AsyncClient(timeout=self.cfg.request_timeout_s, headers=headers, limits=limits)
+
+    async def close(self):
+        for task in list(self._inflight.values()):
+            task.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def ask(self, prompt: str, default: str, budget_s: Optional[float] = None,
+                  system: Optional[str] = None) -> str:
+        """
+        Answer `prompt` within `budget_s` (config default if None), else return
+        `default`. Never raises on HTTP/model errors; those also yield `default`.
+        """
+        messages = _messages(prompt, system)
+        key = prompt_key(self.cfg.model, messages, self.cfg.temperature)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.stats["hits"] += 1
+            return cached
+
+        task = self._request(key, messages)
+
+        budget = self.cfg.budget_s if budget_s is None else budget_s
+        try:
+            # shield: a blown budget must not cancel the shared request
+            return await asyncio.wait_for(asyncio.shield(task), timeout=budget)
+        except asyncio.TimeoutError:
+            self.stats["fallbacks"] += 1
+            logger.warning(f"Agent budget {budget:.2f}s exceeded; using default decision")
+            return default
+        except asyncio.CancelledError:
+            # close() cancelled the shared request; only propagate our own cancellation
+            if not task.cancelled() or asyncio.current_task().cancelling():
+                raise
+            self.stats["fallbacks"] += 1
+            logger.warning("Agent request cancelled (service closed); using default decision")
+            return default
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Agent request failed ({e!r}); using default decision")
+            return default
+
+    def prefetch(self, prompt: str, system: Optional[str] = None):
+        """Fire-and-forget: warm the cache for `prompt` without waiting."""
+        messages = _messages(prompt, system)
+        key = prompt_key(self.cfg.model, messages, self.cfg.temperature)
+        if self.cache.get(key) is None:
+            self._request(key, messages)
+
+    def _request(self, key: str, messages: list) -> asyncio.Task:
+        # Coalesce: identical prompts already in flight share one request.
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+            return task
+        self.stats["misses"] += 1
+        task = asyncio.create_task(self._complete(key, messages))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t, k=key: self._done(k, t))
+        return task
+
+    def _done(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        # Retrieve the exception so abandoned (over-budget) requests don't warn.
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Agent request error: {task.exception()!r}")
+
+    async def _complete(self, key: str, messages: list) -> str:
+        self.start()
+        payload = {"model": self.cfg.model, "messages": messages, "temperature": self.cfg.temperature}
+        async with self._sem:
+            r = await self._client.post(self.cfg.url, json=payload)
+        r.raise_for_status()
+        content = r.json()["choices"][0]["message"]["content"].strip()
+        self.cache.put(key, content)
+        return content
@@ -8,7 +8,7 @@ from src.data.ohlc_rest import fetch_ohlc
 async def main():
     pong = await groq_hello()
     logger.info(f"Groq says: {pong}")
-    await subscribe_ticker(("XBT/USDT","ETH/USDT"))
+    await subscribe_ticker(("BTC/USDT","ETH/USDT"))
     df = await fetch_ohlc("XBTUSDT","1h")
     logger.info(df.tail(3).to_string())
 
@@ -0,0 +1,173 @@
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+# Output columns match src.data.csv_importer (time, OHLC, volume, vwap, trades)
+COLUMNS = ["time", "open", "high", "low", "close", "volume", "vwap", "trades"]
+_UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+_TF = re.compile(r"^(\d+)([smhd])$")
+_VOL = re.compile(r"^vol(\d+(?:\.\d+)?)$")
+
+def parse_bar_spec(spec: str) -> Tuple[str, float]:
+    """
+    "1s", "10s", "1m", "1h", "1d" -> ("time", seconds)
+    "vol100" / "vol0.5"           -> ("volume", units of base asset per bar)
+    Volume bars sit on a fixed cumulative-volume grid: bar k holds the trades
+    that start between k*V and (k+1)*V, so bars average V (trades are not split).
+    """
+    m = _TF.match(spec)
+    if m:
+        return "time", float(int(m.group(1)) * _UNIT_SECONDS[m.group(2)])
+    m = _VOL.match(spec)
+    if m:
+        return "volume", float(m.group(1))
+    raise ValueError(f"Unknown bar spec {spec!r}; use e.g. 1s, 10s, 1m, 1h, 1d or vol100")
+
+def read_trades(csv_path: str, chunksize: int = 5_000_000) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Stream a Kraken trade history CSV (timestamp, price, volume; headerless
+    or with a header row) as (ts_seconds, price, volume) float64 chunks.
+    """
+    p = Path(csv_path)
+    if not p.exists():
+        raise FileNotFoundError(p)
+    with open(p) as f:
+        first = f.readline().split(",")[0].strip()
+    try:
+        float(first)
+        header = None
+    except ValueError:
+        header = 0
+    reader = pd.read_csv(p, header=header, names=["time", "price", "volume"], usecols=[0, 1, 2],
+                         dtype="float64", chunksize=chunksize, engine="c")
+    for chunk in reader:
+        yield chunk["time"].to_numpy(), chunk["price"].to_numpy(), chunk["volume"].to_numpy()
+
+class _Aggregator:
+    """
+    Incremental OHLCV+VWAP+count bars for one bar spec. Each chunk is reduced
+    with `ufunc.reduceat` over runs of equal bar keys; the last (possibly
+    unfinished) bar is carried into the next chunk.
+    """
+    def __init__(self, spec: str):
+        self.spec = spec
+        self.kind, self.size = parse_bar_spec(spec)
+        self.carry: Optional[Dict[str, np.ndarray]] = None
+        self._cum_volume = 0.0  # volume bars: total volume before this chunk
+
+    def _keys(self, ts: np.ndarray, vol: np.ndarray) -> np.ndarray:
+        if self.kind == "time":
+            return np.floor(ts / self.size).astype("int64")
+        # a trade belongs to the volume bar in which it starts (trades are not split)
+        cum = np.cumsum(vol)
+        keys = np.floor((self._cum_volume + cum - vol) / self.size).astype("int64")
+        self._cum_volume += float(cum[-1])
+        return keys
+
+    def update(self, ts: np.ndarray, price: np.ndarray, vol: np.ndarray) -> Optional[Dict[str, np.ndarray]]:
+        """Add a chunk; returns the bars completed by it (column arrays) or None."""
+        if len(ts) == 0:
+            return None
+        keys = self._keys(ts, vol)
+        if self.kind == "time" and np.any(keys[1:] < keys[:-1]):
+            order = np.argsort(keys, kind="stable")
+            keys, ts, price, vol = keys[order], ts[order], price[order], vol[order]
+
+        starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        ends = np.concatenate((starts[1:], [len(keys)]))
+        bars = {
+            "key": keys[starts],
+            "time": ts[starts] if self.kind == "volume" else keys[starts] * self.size,
+            "open": price[starts],
+            "high": np.maximum.reduceat(price, starts),
+            "low": np.minimum.reduceat(price, starts),
+            "close": price[ends - 1],
+            "volume": np.add.reduceat(vol, starts),
+            "pv": np.add.reduceat(price * vol, starts),
+            "trades": (ends - starts).astype("int64"),
+        }
+
+        c = self.carry
+        if c is not None:
+            if bars["key"][0] < c["key"][0]:
+                raise ValueError(f"{self.spec}: trades out of time order across chunks")
+            if bars["key"][0] == c["key"][0]:
+                bars["time"][0] = c["time"][0]
+                bars["open"][0] = c["open"][0]
+                bars["high"][0] = max(bars["high"][0], c["high"][0])
+                bars["low"][0] = min(bars["low"][0], c["low"][0])
+                for k in ("volume", "pv", "trades"):
+                    bars[k][0] += c[k][0]
+                c = None
+        self.carry = {k: v[-1:].copy() for k, v in bars.items()}
+        done = {k: v[:-1] for k, v in bars.items()}
+        if c is not None:
+            done = {k: np.concatenate((c[k], done[k])) for k in done}
+        return done if len(done["key"]) else None
+
+    def flush(self) -> Optional[Dict[str, np.ndarray]]:
+        c, self.carry = self.carry, None
+        return c
+
+def _to_frame(bars: Dict[str, np.ndarray]) -> pd.DataFrame:
+    volume = bars["volume"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        vwap = np.where(volume > 0, bars["pv"] / volume, bars["close"])
+    return pd.DataFrame({
+        "time": pd.to_datetime(bars["time"], unit="s", utc=True),
+        "open": bars["open"], "high": bars["high"], "low": bars["low"], "close": bars["close"],
+        "volume": volume, "vwap": vwap, "trades": bars["trades"],
+    }, columns=COLUMNS)
+
+def aggregate_trades(chunks: Iterable[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+                     specs: Iterable[str]) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """
+    Aggregate streamed (ts, price, volume) chunks into bars for every spec at
+    once. Yields (spec, DataFrame of completed bars) as chunks are consumed;
+    memory is bounded by the chunk size, not the file size.
+    """
+    aggs = [_Aggregator(s) for s in specs]
+    for ts, price, vol in chunks:
+        for agg in aggs:
+            done = agg.update(ts, price, vol)
+            if done is not None:
+                yield agg.spec, _to_frame(done)
+    for agg in aggs:
+        last = agg.flush()
+        if last is not None:
+            yield agg.spec, _to_frame(last)
+
+def import_trades_csv(csv_path: str, symbol: str, specs: Iterable[str], out_dir: str = "data/db",
+                      chunksize: int = 5_000_000) -> Dict[str, str]:
+    """
+    Build bars for each spec from a Kraken trade history CSV and store them as
+    {symbol}_{spec}.parquet (same layout as import_ohlcvt_csv, plus vwap/trades).
+    Returns {spec: output path}.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    specs = list(dict.fromkeys(specs))
+    for s in specs:
+        parse_bar_spec(s)
+    out_root = Path(out_dir)
+    out_root.mkdir(parents=True, exist_ok=True)
+    paths = {s: out_root / f"{symbol.replace('/', '_')}_{s}.parquet" for s in specs}
+    writers: Dict[str, "pq.ParquetWriter"] = {}
+    rows = dict.fromkeys(specs, 0)
+    try:
+        for spec, df in aggregate_trades(read_trades(csv_path, chunksize), specs):
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if spec not in writers:
+                writers[spec] = pq.ParquetWriter(paths[spec], table.schema)
+            writers[spec].write_table(table)
+            rows[spec] += len(df)
+    finally:
+        for w in writers.values():
+            w.close()
+    for s in specs:
+        logger.info(f"Wrote {rows[s]:,} rows -> {paths[s]}")
+    return {s: str(p) for s, p in paths.items() if s in writers}
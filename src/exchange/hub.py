@@ -0,0 +1,354 @@
+# src/exchange/hub.py  (one reconnecting WS per venue, ref-counted subscriptions, fan-out)
+import asyncio, json, random, time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from loguru import logger
+
+SPOT_WS_URL = "wss://ws.kraken.com/v2"
+FUTURES_WS_URL = "wss://demo-futures.kraken.com/ws/v1"  # Live: wss://futures.kraken.com/ws/v1
+CHANNELS = ("ticker", "book", "trade")
+CONNECT_KW = dict(ping_interval=20, ping_timeout=20, close_timeout=10)
+PING_SECONDS = 30
+
+@dataclass(slots=True)
+class MarketEvent:
+    venue: str      # "spot" / "futures"
+    kind: str       # "ticker" / "trade" / "book" / "book_snapshot"
+    symbol: str     # "BTC/USD" (spot) / "PI_XBTUSD" (futures)
+    ts: int         # exchange time in ms (local receive time if the frame has none)
+    price: float    # ticker: last (futures: last/mark/index); trade: fill price; book: level price
+    qty: float = 0.0    # trade size / book level size (0 = level removed)
+    side: str = ""      # trade: "buy"/"sell"; book: "bid"/"ask"
+    bid: float = 0.0    # ticker only
+    ask: float = 0.0    # ticker only
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+def _iso_ms(ts: Optional[str]) -> int:
+    if not ts:
+        return _now_ms()
+    return int(datetime.fromisoformat(ts.replace("Z", "+00:00")).timestamp() * 1000)
+
+def _num(x) -> float:
+    return float(x) if isinstance(x, (int, float)) else 0.0
+
+# ---------------------------------------------------------------- venue protocols
+
+class SpotV2:
+    """Kraken Spot WebSocket v2 (ticker / book / trade)."""
+    name = "spot"
+
+    def __init__(self, url: str = SPOT_WS_URL, book_depth: int = 10):
+        self.url = url
+        self.book_depth = book_depth
+
+    def subscribe(self, channel: str, symbols: List[str], unsubscribe: bool = False) -> dict:
+        params = {"channel": channel, "symbol": symbols}
+        if channel == "book":
+            params["depth"] = self.book_depth
+        return {"method": "unsubscribe" if unsubscribe else "subscribe", "params": params}
+
+    def ping(self) -> dict:
+        return {"method": "ping"}
+
+    def parse(self, msg: dict) -> List[MarketEvent]:
+        channel = msg.get("channel")
+        data = msg.get("data")
+        if channel not in CHANNELS or not isinstance(data, list):
+            return []  # heartbeat / status / method acks
+        out = []
+        if channel == "ticker":
+            now = _now_ms()
+            for d in data:
+                out.append(MarketEvent("spot", "ticker", d.get("symbol", ""), now, _num(d.get("last")),
+                                       qty=_num(d.get("volume")), bid=_num(d.get("bid")), ask=_num(d.get("ask"))))
+        elif channel == "trade":
+            for d in data:
+                out.append(MarketEvent("spot", "trade", d.get("symbol", ""), _iso_ms(d.get("timestamp")),
+                                       _num(d.get("price")), qty=_num(d.get("qty")), side=d.get("side", "")))
+        else:
+            kind = "book_snapshot" if msg.get("type") == "snapshot" else "book"
+            for d in data:
+                sym, ts = d.get("symbol", ""), _iso_ms(d.get("timestamp"))
+                for side, key in (("bid", "bids"), ("ask", "asks")):
+                    for lvl in d.get(key) or ():
+                        out.append(MarketEvent("spot", kind, sym, ts, _num(lvl.get("price")),
+                                               qty=_num(lvl.get("qty")), side=side))
+        return out
+
+class FuturesV1:
+    """Kraken Futures WebSocket v1 (ticker / book / trade)."""
+    name = "futures"
+
+    def __init__(self, url: str = FUTURES_WS_URL):
+        self.url = url
+
+    def subscribe(self, channel: str, symbols: List[str], unsubscribe: bool = False) -> dict:
+        return {"event": "unsubscribe" if unsubscribe else "subscribe", "feed": channel, "product_ids": symbols}
+
+    def ping(self) -> dict:
+        return {"event": "ping"}  # app-level ping, docs: at least every 60s
+
+    def parse(self, msg: dict) -> List[MarketEvent]:
+        feed = msg.get("feed")
+        if "event" in msg or not feed:
+            return []  # info / subscribed / alert / pong
+        sym = msg.get("product_id", "")
+        if feed == "ticker":
+            price = next((float(msg[k]) for k in ("last", "markPrice", "index")
+                          if isinstance(msg.get(k), (int, float))), 0.0)
+            ts = msg.get("time")
+            return [MarketEvent("futures", "ticker", sym, ts if isinstance(ts, int) else _now_ms(), price,
+                                qty=_num(msg.get("volume")), bid=_num(msg.get("bid")), ask=_num(msg.get("ask")))]
+        if feed in ("trade", "trade_snapshot"):
+            trades = msg.get("trades", []) if feed == "trade_snapshot" else [msg]
+            return [MarketEvent("futures", "trade", t.get("product_id", sym), int(t.get("time") or _now_ms()),
+                                _num(t.get("price")), qty=_num(t.get("qty")), side=t.get("side", ""))
+                    for t in trades]
+        if feed == "book":
+            side = "bid" if msg.get("side") == "buy" else "ask"
+            return [MarketEvent("futures", "book", sym, int(msg.get("timestamp") or _now_ms()),
+                                _num(msg.get("price")), qty=_num(msg.get("qty")), side=side)]
+        if feed == "book_snapshot":
+            ts = int(msg.get("timestamp") or _now_ms())
+            return [MarketEvent("futures", "book_snapshot", sym, ts, _num(lvl.get("price")),
+                                qty=_num(lvl.get("qty")), side=side)
+                    for side, key in (("bid", "bids"), ("ask", "asks")) for lvl in msg.get(key) or ()]
+        return []
+
+# ---------------------------------------------------------------- subscriptions
+
+class SubscriptionClosed(Exception):
+    """Raised by `Subscription.get()` once the subscription or its hub is closed."""
+
+_END = object()  # queued to wake consumers blocked on a closed subscription
+
+class Subscription:
+    """
+    A consumer's bounded view of the hub. Iterate with `async for ev in sub`.
+    When the consumer falls behind, the oldest queued event is dropped
+    (`dropped` counts them) so the hub never blocks on a slow subscriber.
+    Iteration ends (and `get()` raises SubscriptionClosed) after `close()`
+    or `MarketDataHub.close()`.
+    """
+    def __init__(self, hub: "MarketDataHub", keys: List[Tuple[str, str, str]], maxsize: int):
+        self.hub = hub
+        self.keys = keys
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.closed = False
+
+    def _push(self, ev):
+        try:
+            self.queue.put_nowait(ev)
+        except asyncio.QueueFull:
+            self.queue.get_nowait()
+            self.queue.put_nowait(ev)
+            self.dropped += 1
+
+    def _end(self):
+        if not self.closed:
+            self.closed = True
+            self._push(_END)
+
+    async def get(self) -> MarketEvent:
+        ev = await self.queue.get()
+        if ev is _END:
+            self.queue.put_nowait(_END)  # keep later get() calls from blocking
+            raise SubscriptionClosed
+        return ev
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> MarketEvent:
+        try:
+            return await self.get()
+        except SubscriptionClosed:
+            raise StopAsyncIteration from None
+
+    async def close(self):
+        await self.hub._unsubscribe(self)
+        self._end()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+class _VenueConnection:
+    """One long-lived, reconnecting WS for a venue; subscriptions are ref-counted."""
+    def __init__(self, proto, dispatch):
+        self.proto = proto
+        self.dispatch = dispatch
+        self.refs: Dict[Tuple[str, str], int] = defaultdict(int)  # (channel, symbol) -> subscribers
+        self.ws = None
+        self.task: Optional[asyncio.Task] = None
+        self.reconnects = 0
+
+    def active(self) -> Dict[str, List[str]]:
+        by_channel = defaultdict(list)
+        for (channel, symbol), n in self.refs.items():
+            if n > 0:
+                by_channel[channel].append(symbol)
+        return by_channel
+
+    async def _send(self, obj: dict):
+        if self.ws is not None:
+            try:
+                await self.ws.send(json.dumps(obj, separators=(",", ":")))
+            except Exception as e:
+                logger.warning(f"[{self.proto.name}] send failed ({e}); will resubscribe on reconnect")
+
+    async def add(self, channel: str, symbols: List[str]):
+        new = []
+        for s in symbols:
+            self.refs[(channel, s)] += 1
+            if self.refs[(channel, s)] == 1:
+                new.append(s)
+        if new:
+            await self._send(self.proto.subscribe(channel, new))
+        if self.task is None:
+            self.task = asyncio.create_task(self._run(), name=f"hub-{self.proto.name}")
+
+    async def remove(self, channel: str, symbols: List[str]):
+        gone = []
+        for s in symbols:
+            self.refs[(channel, s)] -= 1
+            if self.refs[(channel, s)] <= 0:
+                del self.refs[(channel, s)]
+                gone.append(s)
+        if gone:
+            await self._send(self.proto.subscribe(channel, gone, unsubscribe=True))
+
+    async def _pinger(self, ws):
+        while True:
+            await asyncio.sleep(PING_SECONDS)
+            try:
+                await ws.send(json.dumps(self.proto.ping()))
+            except Exception:
+                return  # reader notices the dead socket and reconnects
+
+    async def _run(self):
+        import websockets
+        backoff = 1
+        while True:
+            pinger = None
+            try:
+                logger.info(f"[{self.proto.name}] connecting to {self.proto.url} …")
+                async with websockets.connect(self.proto.url, **CONNECT_KW) as ws:
+                    self.ws = ws
+                    for channel, symbols in self.active().items():
+                        await ws.send(json.dumps(self.proto.subscribe(channel, symbols)))
+                    logger.info(f"[{self.proto.name}] subscribed: {dict(self.active())}")
+                    backoff = 1
+                    pinger = asyncio.create_task(self._pinger(ws))
+                    async for raw in ws:
+                        try:
+                            msg = json.loads(raw)
+                        except ValueError:
+                            continue
+                        if isinstance(msg, dict):
+                            for ev in self.proto.parse(msg):
+                                self.dispatch(ev)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"[{self.proto.name}] WS error: {e!r}")
+            finally:
+                self.ws = None
+                if pinger is not None:
+                    pinger.cancel()
+            # Reconnect with capped exponential backoff + jitter
+            self.reconnects += 1
+            sleep_s = min(30, backoff) + random.random()
+            logger.info(f"[{self.proto.name}] reconnecting in {sleep_s:.1f}s …")
+            await asyncio.sleep(sleep_s)
+            backoff = min(30, backoff * 2)
+
+class MarketDataHub:
+    """
+    Shared market data for the whole process: at most one WS connection per
+    venue, however many consumers. Consumers call `subscribe()` and get a
+    `Subscription` with its own bounded queue of normalized `MarketEvent`s;
+    venue subscriptions are sent on the first reference and removed after the
+    last one is closed.
+
+        async with MarketDataHub() as hub:
+            async with await hub.subscribe("futures", "ticker", ["PI_XBTUSD"]) as sub:
+                async for ev in sub: ...
+    """
+    def __init__(self, spot_url: str = SPOT_WS_URL, futures_url: str = FUTURES_WS_URL):
+        self._protos = {"spot": SpotV2(spot_url), "futures": FuturesV1(futures_url)}
+        self._venues: Dict[str, _VenueConnection] = {}
+        self._subs: Dict[Tuple[str, str, str], Set[Subscription]] = defaultdict(set)
+
+    def _dispatch(self, ev: MarketEvent):
+        kind = "book" if ev.kind == "book_snapshot" else ev.kind
+        for sub in self._subs.get((ev.venue, kind, ev.symbol), ()):
+            sub._push(ev)
+
+    async def subscribe(self, venue: str, channel: str, symbols: List[str], maxsize: int = 10_000) -> Subscription:
+        if venue not in self._protos:
+            raise ValueError(f"Unknown venue {venue!r}; expected one of {list(self._protos)}")
+        if channel not in CHANNELS:
+            raise ValueError(f"Unknown channel {channel!r}; expected one of {CHANNELS}")
+        symbols = list(dict.fromkeys(symbols))
+        sub = Subscription(self, [(venue, channel, s) for s in symbols], maxsize)
+        for key in sub.keys:
+            self._subs[key].add(sub)
+        conn = self._venues.get(venue)
+        if conn is None:
+            conn = self._venues[venue] = _VenueConnection(self._protos[venue], self._dispatch)
+        await conn.add(channel, symbols)
+        return sub
+
+    async def _unsubscribe(self, sub: Subscription):
+        by_venue_channel = defaultdict(list)
+        for key in sub.keys:
+            subs = self._subs.get(key)
+            if subs is None or sub not in subs:
+                continue
+            subs.discard(sub)
+            if not subs:
+                del self._subs[key]
+            venue, channel, symbol = key
+            by_venue_channel[(venue, channel)].append(symbol)
+        for (venue, channel), symbols in by_venue_channel.items():
+            conn = self._venues.get(venue)
+            if conn is not None:  # gone after hub.close()
+                await conn.remove(channel, symbols)
+
+    def stats(self) -> dict:
+        return {name: {"subscriptions": dict(c.active()), "reconnects": c.reconnects}
+                for name, c in self._venues.items()}
+
+    async def close(self):
+        """Close every venue connection and end all live subscriptions."""
+        for subs in self._subs.values():
+            for sub in subs:
+                sub._end()
+        self._subs.clear()
+        for conn in self._venues.values():
+            if conn.ws is not None:
+                try:
+                    await conn.ws.close()
+                except Exception:
+                    pass
+            if conn.task is not None:
+                conn.task.cancel()
+                try:
+                    await conn.task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._venues.clear()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
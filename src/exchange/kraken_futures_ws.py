@@ -1,93 +1,37 @@
-import asyncio, json, websockets, random
+# src/exchange/kraken_futures_ws.py  (Futures ticker + book logger via the shared market-data hub)
+import asyncio
 from loguru import logger
+from src.exchange.hub import FUTURES_WS_URL, MarketDataHub, Subscription
 
-WS_URL = "wss://demo-futures.kraken.com/ws/v1"  # Demo env. Live: futures.kraken.com/ws/v1
+WS_URL = FUTURES_WS_URL  # Demo env. Live: futures.kraken.com/ws/v1
 PRODUCTS = ["PI_XBTUSD", "PI_ETHUSD"]
 
-PING_SECONDS = 55  # per docs: ping at least every 60s to keep alive
-CONNECT_KW = dict(ping_interval=20, ping_timeout=20, close_timeout=10)
+async def _log_ticker(sub: Subscription):
+    async for ev in sub:
+        # Minimal example: log best bid/ask and price (last/mark)
+        logger.info(f"TICK {ev.symbol}: bid {ev.bid} ask {ev.ask} price {ev.price}")
 
-def _j(obj):  # compact JSON for logs
-    return json.dumps(obj, separators=(",", ":"))
-
-async def _send_ping(ws):
-    while True:
-        try:
-            await ws.send(_j({"event": "ping"}))  # app-level ping
-            logger.debug("WS -> ping")
-        except Exception as e:
-            logger.warning(f"Ping failed, stopping pinger: {e}")
-            return
-        await asyncio.sleep(PING_SECONDS)
-
-def _subscription_messages(products):
-    return [
-        {"event": "subscribe", "feed": "ticker", "product_ids": products},
-        {"event": "subscribe", "feed": "book",   "product_ids": products},
-    ]
-
-async def _read_forever(ws):
-    """Read and handle messages indefinitely."""
-    while True:
-        raw = await ws.recv()
-        try:
-            msg = json.loads(raw)
-        except Exception:
-            logger.warning(f"WS: non-JSON message: {raw}")
-            continue
-
-        # Message routing (all observed in your logs)
-        if isinstance(msg, dict) and "event" in msg:
-            ev = msg["event"]
-            if ev in ("info", "subscribed", "unsubscribed"):
-                logger.info(f"WS: {msg}")
-            elif ev == "alert":
-                # Server thought some prior frame was malformed; just log and continue.
-                logger.warning(f"WS ALERT: {msg}")
-            elif ev == "pong":
-                logger.debug("WS <- pong")
-            else:
-                logger.debug(f"WS event: {msg}")
-            continue
-
-        # Non-event data frames (ticker/book/book_snapshot)
-        if isinstance(msg, dict):
-            feed = msg.get("feed")
-            if feed == "ticker":
-                # Minimal example: log best bid/ask and mark price
-                logger.info(f"TICK {msg.get('product_id')}: bid {msg.get('bid')} ask {msg.get('ask')} mark {msg.get('markPrice')}")
-            elif feed in ("book_snapshot", "book"):
-                # Just prove we can parse; full orderbook maint. comes later
-                logger.info(f"BOOK {msg.get('product_id')} seq={msg.get('seq')} feed={feed}")
-            else:
-                logger.debug(f"WS data: {msg}")
+async def _log_book(sub: Subscription):
+    async for ev in sub:
+        # Just prove we can parse; full orderbook maint. comes later
+        if ev.kind == "book_snapshot":
+            logger.debug(f"BOOK {ev.symbol} snapshot {ev.side} {ev.price} x {ev.qty}")
         else:
-            logger.debug(f"WS frame: {msg}")
-
-async def subscribe_ticker_and_book(products=PRODUCTS):
-    """Connect, subscribe, keep alive, and auto-reconnect with jittered backoff."""
-    backoff = 1
-    while True:
-        try:
-            logger.info(f"Connecting to {WS_URL} …")
-            async with websockets.connect(WS_URL, **CONNECT_KW) as ws:
-                # Start keepalive pings
-                pinger = asyncio.create_task(_send_ping(ws))
-                # Send subscriptions
-                for sub in _subscription_messages(products):
-                    await ws.send(_j(sub))
-                    logger.info(f"Subscribed: {sub}")
-
-                # Reset backoff after successful connect
-                backoff = 1
-                await _read_forever(ws)
-        except (websockets.ConnectionClosedError, websockets.ConnectionClosedOK) as e:
-            logger.warning(f"WS closed: {e}")
-        except Exception as e:
-            logger.exception(f"WS error: {e}")
-
-        # Reconnect with capped exponential backoff + jitter
-        sleep_s = min(30, backoff) + random.random()
-        logger.info(f"Reconnecting in {sleep_s:.1f}s …")
-        await asyncio.sleep(sleep_s)
-        backoff = min(30, backoff * 2)
\ No newline at end of file
+            logger.info(f"BOOK {ev.symbol} {ev.side} {ev.price} x {ev.qty}")
+
+async def subscribe_ticker_and_book(products=PRODUCTS, hub: MarketDataHub = None):
+    """
+    Log Futures ticker and book events for `products`. Connection, keepalive
+    and reconnects are the hub's; uses `hub` if given, else a temporary one.
+    """
+    own_hub = hub is None
+    if own_hub:
+        hub = MarketDataHub(futures_url=WS_URL)
+    try:
+        async with await hub.subscribe("futures", "ticker", list(products)) as ticker, \
+                   await hub.subscribe("futures", "book", list(products)) as book:
+            logger.info(f"Subscribed: ticker + book {list(products)}")
+            await asyncio.gather(_log_ticker(ticker), _log_book(book))
+    finally:
+        if own_hub:
+            await hub.close()
@@ -1,15 +1,20 @@
-# src/exchange/kraken_ws.py  (public WS subscribe to ticker)
-import asyncio, json, websockets
+# src/exchange/kraken_ws.py  (public Spot WS v2 ticker via the shared market-data hub)
 from loguru import logger
+from src.exchange.hub import MarketDataHub
 
-WS_URL = "wss://ws.kraken.com"
-
-async def subscribe_ticker(pairs=("XBT/USDT",)):
-    # Kraken WS expects pair notation e.g., "XBT/USDT" or "XBT/USD"
-    sub = {"event":"subscribe","pair": list(pairs),"subscription":{"name":"ticker"}}
-    async with websockets.connect(WS_URL, ping_interval=20, ping_timeout=20) as ws:
-        await ws.send(json.dumps(sub))
-        logger.info("Subscribed: {}", sub)
-        for _ in range(5):  # read a few messages just to validate plumbing
-            msg = await ws.recv()
-            logger.info("WS: {}", msg)
\ No newline at end of file
+async def subscribe_ticker(pairs=("BTC/USDT",), n: int = 5, hub: MarketDataHub = None):
+    """
+    Log the first `n` ticker events for `pairs` (Spot WS v2 notation, e.g.
+    "BTC/USD") to validate plumbing. Uses `hub` if given, else a temporary one.
+    """
+    own_hub = hub is None
+    if own_hub:
+        hub = MarketDataHub()
+    try:
+        async with await hub.subscribe("spot", "ticker", list(pairs)) as sub:
+            logger.info("Subscribed: {}", list(pairs))
+            for _ in range(n):
+                logger.info("WS: {}", await sub.get())
+    finally:
+        if own_hub:
+            await hub.close()
@@ -0,0 +1,208 @@
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+from src.strategies.params import EMAATRParams
+
+@dataclass(slots=True)
+class Fill:
+    time: int      # bar start time, epoch seconds (UTC)
+    product: str
+    side: str      # "BUY" / "SELL"
+    price: float
+    equity: float  # product equity right after the fill
+    reason: str = ""  # "signal" / "stop" / "flatten"
+
+class EMAATRCore:
+    """
+    Event-driven EMA cross + ATR trailing stop strategy with its own broker
+    (position, fills, fees, equity). One instance per product.
+
+    This is the single source of truth for entry/exit/fill/fee rules; both the
+    historical replay (`ema_atr.backtest`) and the live `PaperEngine` drive it
+    with closed target-timeframe bars via `on_bar`, so their results agree.
+
+    Nothing trades until `p.warmup()` bars have been seen (by default
+    max(fast, slow) + atr_period + 2, so the slow EMA is seeded). Live
+    engines can `prime()` a fresh core from stored bars to skip the wait.
+
+    Per closed bar, in order:
+    - pending entry/exit from the previous bar's signal fills at this bar's open
+    - indicators update with this bar (EMA fast/slow, ATR = SMA of true range)
+    - while long: stop trails at max(stop, close - atr_mult * atr); a close
+      below the stop exits at the close
+    - cross-up / cross-down computed on this bar's close arm the next bar's orders
+
+    Accounting: long positions invest the whole product equity; fees
+    (`fee_bps`) are charged on the notional at entry and exit. Equity is
+    marked to the bar close. Everything is plain floats (no pandas) to keep
+    replay throughput high.
+    """
+    __slots__ = (
+        "product", "p", "fee", "allow_entries", "_period", "_mult",
+        "_a_fast", "_a_slow", "_ema_fast", "_ema_slow", "_prev_close",
+        "_tr", "_tr_sum", "_tr_i", "_atr_full", "_warmup", "_bars",
+        "atr", "ready", "entry_signal", "exit_signal",
+        "position", "entry_price", "stop_price", "units", "cash", "equity",
+    )
+
+    def __init__(self, p: EMAATRParams, product: str = ""):
+        self.product = product
+        self.p = p
+        self.fee = p.fee_bps / 10000.0
+        self.allow_entries = True
+        self._period = p.atr_period
+        self._mult = p.atr_mult
+        self._a_fast = 2.0 / (p.fast + 1.0)
+        self._a_slow = 2.0 / (p.slow + 1.0)
+        self._ema_fast = math.nan
+        self._ema_slow = math.nan
+        self._prev_close = math.nan
+        self._tr = [0.0] * p.atr_period  # ring buffer of true ranges
+        self._tr_sum = 0.0
+        self._tr_i = 0
+        self._atr_full = False
+        self._warmup = p.warmup()
+        self._bars = 0
+        self.atr = math.nan
+        self.ready = False  # True once warmup is over (backtest and paper engine alike)
+        self.entry_signal = False
+        self.exit_signal = False
+        self.position = 0  # 0=flat, 1=long
+        self.entry_price = math.nan
+        self.stop_price = math.nan
+        self.units = 0.0
+        self.cash = 1.0
+        self.equity = 1.0
+
+    def on_bar(self, t: int, o: float, h: float, l: float, c: float) -> Optional[list]:
+        """
+        Feed one CLOSED bar. Returns the list of fills it produced, or None.
+        """
+        fills = None
+        # 1) Orders armed on the previous bar's close execute at this open.
+        if self.ready:
+            if self.position == 0:
+                if self.entry_signal and self.allow_entries:
+                    fills = [self._buy(t, o)]
+            elif self.exit_signal:
+                fills = [self._sell(t, o, "signal")]
+
+        # 2) Indicators.
+        pc = self._prev_close
+        tr = h - l
+        if pc == pc:  # not NaN
+            if h - pc > tr:
+                tr = h - pc
+            if pc - l > tr:
+                tr = pc - l
+        i = self._tr_i
+        ring = self._tr
+        self._tr_sum += tr - ring[i]
+        ring[i] = tr
+        i += 1
+        if i == self._period:
+            i = 0
+            self._atr_full = True
+        self._tr_i = i
+        if self._atr_full:
+            atr = self.atr = self._tr_sum / self._period
+        if not self.ready:
+            self._bars += 1
+            self.ready = self._atr_full and self._bars >= self._warmup
+
+        pf = self._ema_fast
+        if pf == pf:
+            ps = self._ema_slow
+            f = pf + self._a_fast * (c - pf)
+            s = ps + self._a_slow * (c - ps)
+            self.entry_signal = f > s and pf <= ps
+            self.exit_signal = f < s and pf >= ps
+            self._ema_fast = f
+            self._ema_slow = s
+        else:
+            self._ema_fast = self._ema_slow = c
+        self._prev_close = c
+
+        # 3) Stop handling and mark-to-market.
+        if self.position == 1:
+            if fills is not None and fills[0].side == "BUY":
+                self.stop_price = o - self._mult * atr
+            dyn = c - self._mult * atr
+            if dyn > self.stop_price:
+                self.stop_price = dyn
+            if c < self.stop_price:
+                fill = self._sell(t, c, "stop")
+                fills = [fill] if fills is None else fills + [fill]
+            else:
+                self.equity = self.units * c
+        return fills
+
+    def prime(self, bars) -> int:
+        """
+        Warm indicators up from historical (t, o, h, l, c) bars without
+        trading, e.g. stored bars before going live. Call on a fresh core.
+        Returns the number of bars consumed.
+        """
+        allow, self.allow_entries = self.allow_entries, False
+        n = 0
+        try:
+            for bar in bars:
+                self.on_bar(*bar)
+                n += 1
+        finally:
+            self.allow_entries = allow
+        self.entry_signal = False  # a cross seen in history must not fire live
+        return n
+
+    def flatten(self, t: int, price: float) -> Optional[Fill]:
+        """Close any open position at `price` (risk controls / shutdown)."""
+        if self.position == 0:
+            return None
+        return self._sell(t, price, "flatten")
+
+    def _buy(self, t: int, price: float) -> Fill:
+        self.units = self.cash * (1.0 - self.fee) / price
+        self.cash = 0.0
+        self.position = 1
+        self.entry_price = price
+        self.equity = self.units * price
+        return Fill(t, self.product, "BUY", price, self.equity, "signal")
+
+    def _sell(self, t: int, price: float, reason: str) -> Fill:
+        self.cash = self.units * price * (1.0 - self.fee)
+        self.units = 0.0
+        self.position = 0
+        self.equity = self.cash
+        fill = Fill(t, self.product, "SELL", price, self.equity, reason)
+        self.entry_price = math.nan
+        self.stop_price = math.nan
+        return fill
+
+class SignalCore(EMAATRCore):
+    """
+    EMAATRCore driven by precomputed per-bar entry/exit signals (e.g. a
+    `features.Strategy` evaluated on a FeatureSet) instead of its EMA cross.
+    Fills, fees, the ATR trailing stop (`atr_period`, `atr_mult`) and the
+    warmup (`p.warmup()`; set `warmup_bars` to the strategy's longest
+    lookback) are the EMAATRCore rules: a signal on bar k fills at the open
+    of bar k+1. Bar k of the replay must be element k of the arrays.
+    """
+    __slots__ = ("_entries", "_exits", "_k")
+
+    def __init__(self, p: EMAATRParams, entry, exit, product: str = ""):
+        super().__init__(p, product)
+        self._entries = [bool(x) for x in entry]
+        self._exits = [bool(x) for x in exit]
+        if len(self._entries) != len(self._exits):
+            raise ValueError("entry and exit signals differ in length")
+        self._k = 0
+
+    def on_bar(self, t: int, o: float, h: float, l: float, c: float) -> Optional[list]:
+        fills = super().on_bar(t, o, h, l, c)
+        k = self._k
+        # replace the EMA cross armed by the base class with this bar's signals
+        self.entry_signal = self._entries[k]
+        self.exit_signal = self._exits[k]
+        self._k = k + 1
+        return fills
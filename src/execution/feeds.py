@@ -0,0 +1,153 @@
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from src.execution.bar_builder import Bar, BarBuilder
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+# Bar tuple as consumed by the core: (epoch_seconds, open, high, low, close)
+BarTuple = Tuple[int, float, float, float, float]
+
+TF_MINUTES = {"1m": 1, "5m": 5, "15m": 15, "30m": 30, "1h": 60, "4h": 240, "12h": 720, "1d": 1440}
+
+_UNIT_PER_SECOND = {"s": 1, "ms": 1_000, "us": 1_000_000, "ns": 1_000_000_000}
+
+# ---------------------------------------------------------------- historical
+
+def load_parquet_bars(path: str) -> Dict[str, "np.ndarray"]:
+    """
+    Read time/open/high/low/close from a {SYMBOL}_{TF}.parquet file as NumPy
+    columns (time as int64 epoch seconds). Goes straight through pyarrow,
+    no DataFrame is built.
+    """
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(path, columns=["time", "open", "high", "low", "close"])
+    tcol = table.column("time")
+    unit = getattr(tcol.type, "unit", "s")  # int columns are taken as seconds
+    t = tcol.to_numpy().astype("int64") // _UNIT_PER_SECOND[unit]
+    out = {"time": t}
+    for name in ("open", "high", "low", "close"):
+        out[name] = table.column(name).to_numpy().astype("float64")
+    return out
+
+def iter_bars(cols: Dict[str, "np.ndarray"]) -> Iterator[BarTuple]:
+    """Iterate bar tuples from columnar arrays (plain Python floats)."""
+    return zip(cols["time"].tolist(), cols["open"].tolist(), cols["high"].tolist(),
+               cols["low"].tolist(), cols["close"].tolist())
+
+def frame_columns(df: "pd.DataFrame") -> Dict[str, "np.ndarray"]:
+    """Same columns as load_parquet_bars, from an in-memory DataFrame."""
+    import pandas as pd
+
+    time = pd.to_datetime(df["time"], utc=True)
+    out = {"time": ((time - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(seconds=1)).to_numpy("int64")}
+    for name in ("open", "high", "low", "close"):
+        out[name] = df[name].to_numpy("float64")
+    return out
+
+class BarFeed:
+    """Historical feed over columnar bars (time/open/high/low/close), in time order."""
+    def __init__(self, cols: Dict[str, "np.ndarray"]):
+        self.cols = cols
+
+    @classmethod
+    def from_frame(cls, df: "pd.DataFrame") -> "BarFeed":
+        return cls(frame_columns(df))
+
+    def __len__(self) -> int:
+        return len(self.cols["time"])
+
+    def __iter__(self) -> Iterator[BarTuple]:
+        return iter_bars(self.cols)
+
+class ParquetBarFeed(BarFeed):
+    """Historical feed: replays stored bars from a {SYMBOL}_{TF}.parquet file."""
+    def __init__(self, path: str):
+        self.path = path
+        super().__init__(load_parquet_bars(path))
+
+def replay(core, bars: Iterable[BarTuple]) -> Tuple[list, list, list]:
+    """
+    Drive `core` (see src.execution.core) with closed bars.
+    Returns (times, equity, fills) where times/equity hold one entry per bar
+    after the warmup bar, i.e. the bars on which a position could be held.
+    """
+    on_bar = core.on_bar
+    times, equity, fills = [], [], []
+    t_append, e_append = times.append, equity.append
+    ready = False
+    for bar in bars:
+        out = on_bar(*bar)
+        if out is not None:
+            fills.extend(out)
+        if ready:
+            t_append(bar[0])
+            e_append(core.equity)
+        else:
+            ready = core.ready
+    return times, equity, fills
+
+# ---------------------------------------------------------------- live
+
+class TimeframeAggregator:
+    """
+    Folds closed base bars (e.g. 1m) into target-timeframe bars. Returns the
+    target bar once a base bar from the next bucket arrives.
+    """
+    def __init__(self, minutes: int):
+        self.seconds = 60 * minutes
+        self._cur: Dict[str, Bar] = {}
+
+    def on_bar(self, symbol: str, bar: Bar) -> Optional[Bar]:
+        ts = int(bar.time.timestamp())
+        bucket = ts - ts % self.seconds
+        cur = self._cur.get(symbol)
+        if cur is not None and int(cur.time.timestamp()) == bucket:
+            cur.high = max(cur.high, bar.high)
+            cur.low = min(cur.low, bar.low)
+            cur.close = bar.close
+            cur.volume += bar.volume
+            return None
+        start = datetime.fromtimestamp(bucket, tz=timezone.utc)
+        self._cur[symbol] = Bar(time=start, open=bar.open, high=bar.high, low=bar.low,
+                                close=bar.close, volume=bar.volume)
+        return cur
+
+async def live_bars(ws_url: str, products: list, base_minutes: int = 1, target_minutes: int = 60,
+                    on_base_bar: Optional[Callable[[str, Bar], None]] = None,
+                    hub=None) -> AsyncIterator[Tuple[str, Bar]]:
+    """
+    Live feed: Kraken Futures ticker -> base bars -> target bars.
+    Yields (product, closed target bar); `on_base_bar` sees every closed base bar.
+    Ticks come from a `MarketDataHub` (shared, reconnecting); one is created
+    for `ws_url` if `hub` is not given.
+    """
+    from loguru import logger
+    from src.exchange.hub import MarketDataHub
+
+    builder = BarBuilder(minutes=base_minutes)
+    agg = TimeframeAggregator(target_minutes)
+    own_hub = hub is None
+    if own_hub:
+        hub = MarketDataHub(futures_url=ws_url)
+    sub = await hub.subscribe("futures", "ticker", products)
+    try:
+        async for ev in sub:
+            if not ev.price:
+                continue
+            closed = builder.on_tick(ev.symbol, ev.ts, ev.price)
+            if closed is None:
+                continue
+            logger.debug(f"[{ev.symbol}] bar closed {closed.time:%Y-%m-%d %H:%M} c={closed.close}")
+            if on_base_bar is not None:
+                on_base_bar(ev.symbol, closed)
+            target = agg.on_bar(ev.symbol, closed)
+            if target is not None:
+                yield ev.symbol, target
+    finally:
+        await sub.close()
+        if own_hub:
+            await hub.close()
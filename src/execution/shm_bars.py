@@ -0,0 +1,352 @@
+import asyncio, json, mmap, os, time
+from multiprocessing import shared_memory
+from typing import Dict, Optional
+import numpy as np
+
+from src.execution.bar_builder import Bar
+
+# Layout of the shared block (all little-endian, 8-byte aligned):
+#   header  int64[6]                 MAGIC, capacity, n_products, seq, generation, closed
+#   names   bytes[n_products, 32]    product ids (utf-8, NUL padded)
+#   counts  int64[n_products]        bars ever written per product
+#   locks   int64[n_products]        per-product seqlock, odd while a bar is being written
+#   data    float64[n_products, 2*capacity, 6]   time, open, high, low, close, volume
+# Each bar is written twice (slot i and i+capacity): the latest N bars of a
+# product are then always one contiguous slice, so readers get plain views.
+# `closed` is set when the writer goes away (close, or a restarted writer
+# replacing the block); readers then re-attach to the new block by name.
+MAGIC = 0x4B42415253484D32  # "KBARSHM2"
+# Sharded runs publish one ring per shard and, under the base name, a small
+# index block: int64[2] INDEX_MAGIC, length, then utf-8 JSON {product: ring}.
+INDEX_MAGIC = 0x4B42415249445831  # "KBARIDX1"
+FIELDS = ("time", "open", "high", "low", "close", "volume")
+_NAME_BYTES = 32
+_HEADER = 6
+_SEQ, _GENERATION, _CLOSED = 3, 4, 5
+
+class RingClosed(RuntimeError):
+    """The writer closed the ring and no replacement block exists (yet)."""
+
+def _layout(capacity: int, n_products: int):
+    names_off = _HEADER * 8
+    counts_off = names_off + n_products * _NAME_BYTES
+    locks_off = counts_off + n_products * 8
+    data_off = locks_off + n_products * 8
+    size = data_off + n_products * 2 * capacity * len(FIELDS) * 8
+    return names_off, counts_off, locks_off, data_off, size
+
+def _attach(name: str):
+    """
+    Open an existing block without registering it with this process's
+    resource tracker (before 3.13 an attached SharedMemory gets unlinked when
+    the *reader* exits). Returns an object exposing `.buf` and `.close()`.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # 3.13+
+    except TypeError:
+        pass
+    if os.name == "nt":  # no resource tracker for shared memory on Windows
+        return shared_memory.SharedMemory(name=name)
+    import _posixshmem
+    fd = _posixshmem.shm_open("/" + name, os.O_RDWR, mode=0o600)
+    try:
+        m = mmap.mmap(fd, os.fstat(fd).st_size)
+    finally:
+        os.close(fd)
+
+    class _Mapped:
+        buf = memoryview(m)
+        def close(self):
+            self.buf.release()
+            m.close()
+    return _Mapped()
+
+class _Ring:
+    def _map(self, shm, name: str):
+        buf = shm.buf
+        self.name = name
+        self.header = np.ndarray((_HEADER,), dtype="<i8", buffer=buf)
+        if int(self.header[0]) != MAGIC:
+            raise ValueError(f"shared memory {name!r} is not a bar ring")
+        self.capacity, n = int(self.header[1]), int(self.header[2])
+        names_off, counts_off, locks_off, data_off, _ = _layout(self.capacity, n)
+        names = bytes(buf[names_off:counts_off])
+        self.products = [names[i * _NAME_BYTES:(i + 1) * _NAME_BYTES].rstrip(b"\0").decode() for i in range(n)]
+        self.index: Dict[str, int] = {p: i for i, p in enumerate(self.products)}
+        self.counts = np.ndarray((n,), dtype="<i8", buffer=buf, offset=counts_off)
+        self.locks = np.ndarray((n,), dtype="<i8", buffer=buf, offset=locks_off)
+        self.data = np.ndarray((n, 2 * self.capacity, len(FIELDS)), dtype="<f8", buffer=buf, offset=data_off)
+
+    @property
+    def seq(self) -> int:
+        """Total bars published (all products); bumps after each write."""
+        return int(self.header[_SEQ])
+
+    @property
+    def generation(self) -> int:
+        """Identifies the writer instance; changes when a restarted writer replaces the block."""
+        return int(self.header[_GENERATION])
+
+    def _unmap(self):
+        self.header = self.counts = self.locks = self.data = None  # release buffer exports
+
+class BarRingWriter(_Ring):
+    """
+    Single-writer shared-memory ring of closed bars per product.
+    The engine publishes every bar BarBuilder closes; any process can attach
+    a `BarRingReader` by `name` without opening its own WS connection.
+    """
+    def __init__(self, name: str, products: list, capacity: int = 1440):
+        *_, size = _layout(capacity, len(products))
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:  # stale block from a previous run (e.g. a restarted shard)
+            old = shared_memory.SharedMemory(name=name)
+            _mark_closed(old)
+            old.close()
+            old.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        names_off, *_ = _layout(capacity, len(products))
+        header = np.ndarray((_HEADER,), dtype="<i8", buffer=self.shm.buf)
+        header[1:] = (capacity, len(products), 0, time.time_ns(), 0)
+        for i, p in enumerate(products):
+            raw = p.encode()[:_NAME_BYTES]
+            start = names_off + i * _NAME_BYTES
+            self.shm.buf[start:start + len(raw)] = raw
+        header[0] = MAGIC
+        del header
+        self._map(self.shm, name)
+
+    def publish(self, product: str, bar: Bar):
+        i = self.index.get(product)
+        if i is None:
+            return
+        n = int(self.counts[i])
+        slot = n % self.capacity
+        row = (bar.time.timestamp(), bar.open, bar.high, bar.low, bar.close, bar.volume)
+        # seqlock: odd while the rows / count are inconsistent, then global seq
+        self.locks[i] += 1
+        self.data[i, slot] = row
+        self.data[i, slot + self.capacity] = row
+        self.counts[i] = n + 1
+        self.locks[i] += 1
+        self.header[_SEQ] += 1
+
+    def close(self, unlink: bool = True):
+        if unlink:
+            self.header[_CLOSED] = 1
+        self._unmap()
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+def _mark_closed(shm):
+    """Flag a block being replaced so readers still attached to it re-attach."""
+    if shm.size >= _HEADER * 8:
+        header = np.ndarray((_HEADER,), dtype="<i8", buffer=shm.buf)
+        if int(header[0]) == MAGIC:
+            header[_CLOSED] = 1
+        del header
+
+class BarRingReader(_Ring):
+    """
+    Attach to a ring published by `BarRingWriter` (any process).
+
+    `latest(product, n)` returns a zero-copy (n, 6) float64 view in time
+    order; columns follow `FIELDS` (time is epoch seconds). Views alias live
+    memory: a row can be overwritten once `capacity` newer bars for that
+    product have been written, so use `snapshot()` (seqlock-checked copy)
+    when holding data across waits.
+
+    If the writer restarts (same name, new block), `latest()` / `wait()`
+    re-attach to the new block; `generation` changes and `seq` restarts.
+    `RingClosed` is raised by `latest()` while no writer block exists.
+    """
+    def __init__(self, name: str):
+        self.shm = _attach(name)
+        self._map(self.shm, name)
+
+    def _check(self):
+        """Re-attach if the writer closed or replaced our block."""
+        if int(self.header[_CLOSED]):
+            try:
+                shm = _attach(self.name)
+            except FileNotFoundError:
+                raise RingClosed(f"bar ring {self.name!r} was closed by its writer") from None
+            header = np.ndarray((_HEADER,), dtype="<i8", buffer=shm.buf)
+            ok = int(header[0]) == MAGIC and not int(header[_CLOSED])
+            del header
+            if not ok:  # old block still being torn down, or new one not initialised yet
+                shm.close()
+                raise RingClosed(f"bar ring {self.name!r} is being replaced")
+            self.close()
+            self.shm = shm
+            self._map(shm, self.name)
+
+    def count(self, product: str) -> int:
+        self._check()
+        return int(self.counts[self.index[product]])
+
+    def latest(self, product: str, n: Optional[int] = None) -> np.ndarray:
+        self._check()
+        return self._view(self.index[product], n)
+
+    def _view(self, i: int, n: Optional[int]) -> np.ndarray:
+        have = int(self.counts[i])
+        n = min(have, self.capacity if n is None else min(n, self.capacity))
+        end = have % self.capacity + self.capacity
+        return self.data[i, end - n:end]
+
+    def snapshot(self, product: str, n: Optional[int] = None, timeout: float = 1.0) -> np.ndarray:
+        """
+        Copy of `latest()`, retried while/if the writer touched the product
+        mid-copy (spin briefly, then back off up to 1ms). Re-attaches if the
+        block was replaced; raises RingClosed if the writer is gone, or stayed
+        mid-write (killed between the lock bumps) for `timeout` seconds.
+        """
+        deadline = time.monotonic() + timeout
+        spins, pause = 0, 0.0
+        while True:
+            self._check()
+            i = self.index[product]
+            before = int(self.locks[i])
+            if not before & 1:  # no write in progress
+                out = self._view(i, n).copy()
+                if int(self.locks[i]) == before:
+                    return out
+            if time.monotonic() >= deadline:
+                raise RingClosed(f"bar ring {self.name!r}: writer stalled mid-write on {product!r}")
+            if spins < 1000:
+                spins += 1
+                continue
+            pause = min(0.001, pause * 2 or 0.00005)
+            time.sleep(pause)
+
+    def wait(self, after_seq: int, timeout: Optional[float] = None) -> int:
+        """
+        Block until `seq` > `after_seq` (spin briefly, then back off up to 1ms).
+        Returns the new seq, or the current one on timeout. If the writer
+        restarted, returns right after re-attaching (seq restarts from the
+        new block's value; compare `generation` to detect it).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        spins, pause = 0, 0.0
+        while True:
+            if int(self.header[_CLOSED]):
+                try:
+                    self._check()
+                    return self.seq
+                except RingClosed:
+                    spins = 1000  # writer gone: just back off until it returns
+            else:
+                seq = int(self.header[_SEQ])
+                if seq > after_seq:
+                    return seq
+            if deadline is not None and time.monotonic() >= deadline:
+                return self.seq
+            if spins < 1000:
+                spins += 1
+                continue
+            pause = min(0.001, pause * 2 or 0.00005)
+            time.sleep(pause)
+
+    async def wait_async(self, after_seq: int, timeout: Optional[float] = None, poll_s: float = 0.001) -> int:
+        """Asyncio flavour of `wait()` (polls every `poll_s`)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if int(self.header[_CLOSED]):
+                try:
+                    self._check()
+                    return self.seq
+                except RingClosed:
+                    pass
+            else:
+                seq = self.seq
+                if seq > after_seq:
+                    return seq
+            if deadline is not None and time.monotonic() >= deadline:
+                return self.seq
+            await asyncio.sleep(poll_s)
+
+    def close(self):
+        self._unmap()
+        try:
+            self.shm.close()
+        except BufferError:  # caller still holds views from latest(); freed with them
+            pass
+
+def write_ring_index(name: str, rings: Dict[str, str]):
+    """
+    Publish which ring holds each product ({product: ring name}) under `name`.
+    Returns the SharedMemory block; the owner closes and unlinks it on exit.
+    """
+    raw = json.dumps(rings).encode()
+    size = 16 + len(raw)
+    try:
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+    except FileExistsError:  # stale index (or single ring) from a previous run
+        old = shared_memory.SharedMemory(name=name)
+        _mark_closed(old)
+        old.close()
+        old.unlink()
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+    shm.buf[16:size] = raw
+    header = np.ndarray((2,), dtype="<i8", buffer=shm.buf)
+    header[1] = len(raw)
+    header[0] = INDEX_MAGIC
+    del header
+    return shm
+
+def read_ring_index(name: str) -> Dict[str, str]:
+    """
+    {product: ring name} for the bars published under `name`: the index of a
+    sharded run, or every product of a single ring mapped to `name` itself.
+    """
+    shm = _attach(name)
+    try:
+        header = np.ndarray((2,), dtype="<i8", buffer=shm.buf)
+        magic, length = int(header[0]), int(header[1])
+        del header
+        if magic == INDEX_MAGIC:
+            return json.loads(bytes(shm.buf[16:16 + length]))
+    finally:
+        shm.close()
+    ring = BarRingReader(name)
+    try:
+        return {p: name for p in ring.products}
+    finally:
+        ring.close()
+
+class ShardedBarReader:
+    """
+    Product-level access to the bars published under `name`, whether by one
+    PaperEngine (a single ring) or a sharded run (one ring per shard plus an
+    index). Rings are attached lazily, the first time one of their products
+    is read, and re-attach on shard restarts like `BarRingReader`.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.rings: Dict[str, str] = read_ring_index(name)
+        self.products = list(self.rings)
+        self._readers: Dict[str, BarRingReader] = {}
+
+    def reader_for(self, product: str) -> BarRingReader:
+        ring = self.rings[product]
+        reader = self._readers.get(ring)
+        if reader is None:
+            reader = self._readers[ring] = BarRingReader(ring)
+        return reader
+
+    def count(self, product: str) -> int:
+        return self.reader_for(product).count(product)
+
+    def latest(self, product: str, n: Optional[int] = None) -> np.ndarray:
+        return self.reader_for(product).latest(product, n)
+
+    def snapshot(self, product: str, n: Optional[int] = None, timeout: float = 1.0) -> np.ndarray:
+        return self.reader_for(product).snapshot(product, n, timeout)
+
+    def close(self):
+        for reader in self._readers.values():
+            reader.close()
+        self._readers.clear()
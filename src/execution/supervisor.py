@@ -0,0 +1,243 @@
+import asyncio, csv, math, os, time
+import multiprocessing as mp
+from dataclasses import replace
+from datetime import datetime, timezone
+from multiprocessing.connection import Connection, wait
+from pathlib import Path
+from typing import Dict, List, Optional
+from loguru import logger
+
+from src.execution.core import Fill
+from src.execution.feeds import TF_MINUTES, live_bars
+from src.execution.paper_engine import WS_URL, EngineConfig, make_cores
+
+def shard_products(products: list, shards: int) -> List[list]:
+    """Round-robin `products` into at most `shards` non-empty groups."""
+    shards = max(1, min(shards, len(products)))
+    return [products[i::shards] for i in range(shards)]
+
+# ---------------------------------------------------------------- worker
+
+def _shard_main(shard_id: int, cfg: EngineConfig, conn: Connection):
+    """Process entry point: one WS connection, bar builder and cores per shard."""
+    try:
+        asyncio.run(_shard_run(shard_id, cfg, conn))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+async def _shard_run(shard_id: int, cfg: EngineConfig, conn: Connection):
+    """
+    Worker -> parent messages (tuples over the pipe):
+      ("bar", product, t, equity)   after every closed target bar
+      ("fill", Fill)                for every simulated fill
+    Parent -> worker commands:
+      ("halt",)    flatten everything at the last close, block new entries
+      ("resume",)  allow entries again
+    """
+    cores = make_cores(cfg)
+    last = {p: (0, math.nan) for p in cfg.products}  # product -> (t, close)
+    loop = asyncio.get_running_loop()
+    main_task = asyncio.current_task()
+
+    def on_command():
+        try:
+            cmd = conn.recv()
+        except EOFError:  # parent went away
+            loop.remove_reader(conn.fileno())
+            main_task.cancel()
+            return
+        if cmd[0] == "halt":
+            for p, core in cores.items():
+                core.allow_entries = False
+                fill = core.flatten(last[p][0], last[p][1])
+                if fill is not None:
+                    conn.send(("fill", fill))
+                    conn.send(("bar", p, last[p][0], core.equity))
+        elif cmd[0] == "resume":
+            for core in cores.values():
+                core.allow_entries = True
+
+    loop.add_reader(conn.fileno(), on_command)
+    ring = None
+    if cfg.shm_bars:
+        from src.execution.shm_bars import BarRingWriter
+        ring = BarRingWriter(f"{cfg.shm_bars}-{shard_id}", cfg.products)
+    logger.info(f"Shard {shard_id} (pid {os.getpid()}) starting | products={cfg.products}")
+    try:
+        async for product, bar in live_bars(WS_URL, cfg.products,
+                                            base_minutes=TF_MINUTES[cfg.base_tf],
+                                            target_minutes=TF_MINUTES[cfg.target_tf],
+                                            on_base_bar=ring.publish if ring else None):
+            t = int(bar.time.timestamp())
+            core = cores[product]
+            fills = core.on_bar(t, bar.open, bar.high, bar.low, bar.close)
+            last[product] = (t, bar.close)
+            if fills:
+                for fill in fills:
+                    conn.send(("fill", fill))
+            conn.send(("bar", product, t, core.equity))
+    finally:
+        if ring is not None:
+            ring.close()
+
+# ---------------------------------------------------------------- parent
+
+class ShardSupervisor:
+    """
+    Runs `cfg.products` sharded over worker processes (one WS connection,
+    bar builder and set of EMAATRCore per shard). Workers stream fills and
+    per-product equity back over a Pipe; the parent keeps the equal-weight
+    portfolio equity (each product a 1/N stake, as in PaperEngine),
+    enforces `daily_loss_limit_pct` across all shards, writes the trades CSV
+    and restarts crashed shards with capped backoff.
+
+    A restarted shard starts flat: products it held are booked at their last
+    reported equity. With `cfg.shm_bars` set, shard i publishes its base bars
+    to the shared-memory ring "<shm_bars>-<i>", and the parent publishes the
+    product -> ring index under "<shm_bars>" (read it with ShardedBarReader).
+    """
+    worker = staticmethod(_shard_main)  # process target(shard_id, cfg, conn)
+
+    def __init__(self, cfg: EngineConfig, shards: Optional[int] = None):
+        self.cfg = cfg
+        self.groups = shard_products(cfg.products, shards or os.cpu_count() or 1)
+        self._ctx = mp.get_context("spawn")
+        self._procs: Dict[int, mp.Process] = {}
+        self._conns: Dict[int, Connection] = {}
+        self._restarts = {i: 0 for i in range(len(self.groups))}
+        self._restart_at: Dict[int, float] = {}
+        self._ring_index = None
+        # equal-weight portfolio: equity = mean(base[p] * live[p]); base absorbs shard restarts
+        self._base = {p: 1.0 for p in cfg.products}
+        self._live = {p: 1.0 for p in cfg.products}
+        self._equity = 1.0
+        self._day_start_equity = 1.0
+        self._today = None
+        self._paused = False
+        Path(cfg.log_dir).mkdir(parents=True, exist_ok=True)
+        self._trades_path = Path(cfg.trades_csv)
+        if not self._trades_path.exists():
+            self._trades_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self._trades_path, "w", newline="") as f:
+                csv.writer(f).writerow(["time", "product", "side", "price", "equity"])
+
+    def _start(self, shard_id: int):
+        parent, child = self._ctx.Pipe(duplex=True)
+        shard_cfg = replace(self.cfg, products=self.groups[shard_id])
+        proc = self._ctx.Process(target=self.worker, args=(shard_id, shard_cfg, child),
+                                 name=f"paper-shard-{shard_id}", daemon=True)
+        proc.start()
+        child.close()
+        self._procs[shard_id] = proc
+        self._conns[shard_id] = parent
+        if self._paused:
+            parent.send(("halt",))
+
+    def _drain(self, conn: Connection):
+        try:
+            while conn.poll():
+                self._on_message(conn.recv())
+        except (EOFError, OSError):
+            pass  # exit handled through the sentinel
+
+    def _on_exit(self, shard_id: int):
+        proc = self._procs.pop(shard_id)
+        conn = self._conns.pop(shard_id)
+        self._drain(conn)  # fills sent right before the crash
+        conn.close()
+        proc.join(timeout=1)
+        for p in self.groups[shard_id]:
+            self._base[p] *= self._live[p]
+            self._live[p] = 1.0
+        n = self._restarts[shard_id] = self._restarts[shard_id] + 1
+        delay = min(30, 2 ** (n - 1))
+        self._restart_at[shard_id] = time.monotonic() + delay
+        logger.error(f"Shard {shard_id} exited (code {proc.exitcode}); restart #{n} in {delay}s")
+
+    def _send_all(self, cmd: tuple):
+        for conn in self._conns.values():
+            try:
+                conn.send(cmd)
+            except (BrokenPipeError, OSError):
+                pass  # shard is dying; picked up via its sentinel
+
+    def _on_message(self, msg: tuple):
+        if msg[0] == "fill":
+            fill: Fill = msg[1]
+            self._live[fill.product] = fill.equity
+            self._update_equity()
+            self._log_trade(fill)
+            return
+        _, product, t, equity = msg
+        self._live[product] = equity
+        self._update_equity()
+        self._check_risk(t)
+
+    def _update_equity(self):
+        # each product trades a 1/N stake of the starting capital
+        base = self._base
+        self._equity = sum(base[p] * e for p, e in self._live.items()) / len(self._live)
+
+    def _check_risk(self, t: int):
+        day = datetime.fromtimestamp(t, tz=timezone.utc).date()
+        if self._today is None or day > self._today:
+            self._today = day
+            self._day_start_equity = self._equity
+            if self._paused:
+                self._paused = False
+                self._send_all(("resume",))
+            logger.info(f"New UTC day {day}, daily loss limit reference set: equity={self._equity:.4f}")
+        dd_pct = (self._equity / self._day_start_equity - 1.0) * 100.0
+        if not self._paused and dd_pct <= -abs(self.cfg.daily_loss_limit_pct):
+            logger.warning("Daily loss limit hit — closing positions to flat on all shards.")
+            self._paused = True
+            self._send_all(("halt",))
+            logger.error(f"Trading paused for the day. PnL today: {dd_pct:.2f}%")
+
+    def _log_trade(self, fill: Fill):
+        ts = datetime.fromtimestamp(fill.time, tz=timezone.utc)
+        with open(self._trades_path, "a", newline="") as f:
+            csv.writer(f).writerow([ts.isoformat(), fill.product, fill.side, fill.price, self._equity])
+        action = "ENTER" if fill.side == "BUY" else f"EXIT ({fill.reason})"
+        logger.info(f"[{fill.product}] {action} @ {fill.price:.2f} | equity={self._equity:.4f}")
+
+    def start(self):
+        logger.info(f"Starting {len(self.groups)} shards for {len(self.cfg.products)} products")
+        if self.cfg.shm_bars:
+            from src.execution.shm_bars import write_ring_index
+            self._ring_index = write_ring_index(self.cfg.shm_bars, {
+                p: f"{self.cfg.shm_bars}-{i}" for i, group in enumerate(self.groups) for p in group})
+        for i in range(len(self.groups)):
+            self._start(i)
+
+    def poll(self, timeout: float = 1.0):
+        """One supervision step: due restarts, then worker messages and exits."""
+        now = time.monotonic()
+        for i, at in list(self._restart_at.items()):
+            if now >= at:
+                del self._restart_at[i]
+                self._start(i)
+        by_conn = {c: i for i, c in self._conns.items()}
+        by_sentinel = {self._procs[i].sentinel: i for i in self._procs}
+        for obj in wait(list(by_conn) + list(by_sentinel), timeout=timeout):
+            if obj in by_conn:
+                if by_conn[obj] in self._conns:
+                    self._drain(obj)
+            elif by_sentinel[obj] in self._procs:
+                self._on_exit(by_sentinel[obj])
+
+    def stop(self):
+        for proc in self._procs.values():
+            proc.terminate()
+        if self._ring_index is not None:
+            self._ring_index.close()
+            self._ring_index.unlink()
+            self._ring_index = None
+
+    def run(self):
+        self.start()
+        try:
+            while True:
+                self.poll()
+        finally:
+            self.stop()
@@ -1,118 +1,87 @@
 import numpy as np
 import pandas as pd
-from dataclasses import dataclass
+from src.strategies.params import EMAATRParams
 
-@dataclass
-class EMAATRParams:
-    fast: int = 20
-    slow: int = 50
-    atr_period: int = 14
-    atr_mult: float = 2.0
-    fee_bps: float = 1.0  # 1 basis point per side (0.01%)
-
-def _ema(series: pd.Series, span: int) -> pd.Series:
-    return series.ewm(span=span, adjust=False).mean()
+def generate_signals(df: pd.DataFrame, p: EMAATRParams, features=None) -> pd.DataFrame:
+    """
+    df plus ema_fast, ema_slow, atr, entry_signal (cross-up) and exit_signal
+    (cross-down), evaluated on the feature graph (src.strategies.features).
+    Pass `features=FeatureSet.from_frame(df)` to share EMAs/ATRs across calls
+    (e.g. a parameter sweep); by default each call evaluates `df` afresh.
+    Note `df.assign` copies the frame unless pandas copy-on-write is on; use
+    `ema_cross(...).signals(features)` for the arrays alone.
+    """
+    from src.strategies.features import FeatureSet, ema_cross
 
-def _atr(df: pd.DataFrame, period: int) -> pd.Series:
-    # df columns: time, open, high, low, close, volume
-    high, low, close = df["high"], df["low"], df["close"]
-    prev_close = close.shift(1)
-    tr = pd.concat([
-        (high - low),
-        (high - prev_close).abs(),
-        (low - prev_close).abs()
-    ], axis=1).max(axis=1)
-    return tr.rolling(period).mean()
+    fs = features if features is not None else FeatureSet.from_frame(df)
+    return df.assign(**ema_cross(p.fast, p.slow, p.atr_period).signals(fs))
 
-def generate_signals(df: pd.DataFrame, p: EMAATRParams) -> pd.DataFrame:
-    out = df.copy()
-    out["ema_fast"] = _ema(out["close"], p.fast)
-    out["ema_slow"] = _ema(out["close"], p.slow)
-    out["atr"] = _atr(out, p.atr_period)
+def backtest(df: pd.DataFrame, p: EMAATRParams) -> dict:
+    """backtest_feed over an in-memory OHLC DataFrame (columns time/open/high/low/close)."""
+    from src.execution.feeds import BarFeed
 
-    # Cross signals (long-only)
-    cross_up = (out["ema_fast"] > out["ema_slow"]) & (out["ema_fast"].shift(1) <= out["ema_slow"].shift(1))
-    cross_dn = (out["ema_fast"] < out["ema_slow"]) & (out["ema_fast"].shift(1) >= out["ema_slow"].shift(1))
-    out["entry_signal"] = cross_up
-    out["exit_signal"]  = cross_dn
-    return out
+    return backtest_feed(BarFeed.from_frame(df), p)
 
-def backtest(df: pd.DataFrame, p: EMAATRParams) -> dict:
+def backtest_feed(feed, p: EMAATRParams) -> dict:
     """
-    Long/flat simulation:
+    Long/flat simulation, replayed bar by bar from a historical feed
+    (src.execution.feeds.BarFeed / ParquetBarFeed) through the event-driven
+    core (src.execution.core.EMAATRCore) that also drives the paper engine:
     - Enter on ema cross-up at next bar's open.
-    - Exit on ema cross-down OR ATR stop hit; exits at next bar's open or at stop price if stop breached.
-    - 1 unit notional; equity in % terms. Fees charged on trade entries/exits: fee_bps.
+    - Exit on ema cross-down at next bar's open, or at the close when the close
+      breaks the ATR trailing stop.
+    - Whole equity invested; fee_bps charged on entry and exit notional.
     """
-    data = generate_signals(df, p).copy()
-    data = data.dropna().reset_index(drop=True)  # drop warmup
-
-    position = 0  # 0=flat, 1=long
-    entry_price = np.nan
-    stop_price = np.nan
-    fees = p.fee_bps / 10000.0
-
-    trades = []
-    rets = []  # per-bar return when in position; fees applied on entry/exit bars
+    from src.execution.core import EMAATRCore
+    from src.execution.feeds import replay
 
-    for i in range(1, len(data)):
-        row_prev = data.iloc[i-1]
-        row = data.iloc[i]
+    _, eq, fills = replay(EMAATRCore(p), feed)
+    return _report(feed.cols["time"], eq, fills, p)
 
-        # Default: carry no return if flat, otherwise pct change close-close
-        r = 0.0
-        if position == 1:
-            # mark-to-market return
-            r = (row["close"] / row_prev["close"]) - 1.0
-
-        # Entry logic (on previous bar signal -> execute at current bar open)
-        if position == 0 and row_prev["entry_signal"]:
-            position = 1
-            entry_price = row["open"]
-            stop_price = entry_price - p.atr_mult * row["atr"]
-            # apply entry fee (reduce equity)
-            r -= fees
-
-        # If in position: update stop dynamically (trailing on ATR below close)
-        if position == 1:
-            dynamic_stop = row["close"] - p.atr_mult * row["atr"]
-            if not np.isnan(dynamic_stop):
-                stop_price = max(stop_price, dynamic_stop)
-
-            # Exit conditions (prioritize stop if breached within bar; we approximate w/ close)
-            exit_now = False
-            # Cross-down exits on next bar open
-            if row_prev["exit_signal"]:
-                exit_now = True
-                exit_price = row["open"]
-            # ATR stop: if close below stop -> exit at close (pessimistic)
-            if not exit_now and (row["close"] < stop_price):
-                exit_now = True
-                exit_price = row["close"]
-
-            if exit_now:
-                # Adjust last return to reflect exit price vs prev close
-                # Replace r with (exit/prev_close - 1)
-                r = (exit_price / row_prev["close"]) - 1.0
-                r -= fees  # exit fee
-                trades.append({
-                    "time": row["time"],
-                    "entry": float(entry_price),
-                    "exit": float(exit_price),
-                    "pct": float((exit_price / entry_price) - 1.0)
-                })
-                position = 0
-                entry_price = np.nan
-                stop_price = np.nan
-
-        rets.append(r)
+def backtest_signals(strategy, fs, feed, p: EMAATRParams) -> dict:
+    """
+    backtest_feed for any `features.Strategy`: its entry/exit signals, evaluated
+    on `fs` (a FeatureSet of the same bars as `feed`), drive the core's broker
+    (src.execution.core.SignalCore) -- next-open fills, ATR trailing stop
+    (p.atr_period / p.atr_mult), fees and warmup as in backtest_feed.
+    Same result dict; the summary also names the strategy.
+    """
+    from src.execution.core import SignalCore
+    from src.execution.feeds import replay
+
+    if len(fs) != len(feed):
+        raise ValueError(f"FeatureSet has {len(fs)} bars, feed has {len(feed)}")
+    sig = fs.compute({"entry": strategy.entry, "exit": strategy.exit})
+    _, eq, fills = replay(SignalCore(p, sig["entry"], sig["exit"]), feed)
+    out = _report(feed.cols["time"], eq, fills, p)
+    out["summary"]["strategy"] = strategy.name
+    return out
 
-    # Equity curve
-    ret_series = pd.Series(rets, index=data.index[1:])
-    equity = (1.0 + ret_series).cumprod()
+def _report(t, eq, fills, p: EMAATRParams) -> dict:
+    """Trades, equity/return series and summary metrics of one replay."""
+    trades = []
+    entry_price = np.nan
+    for f in fills:
+        if f.side == "BUY":
+            entry_price = f.price
+        else:
+            trades.append({
+                "time": pd.Timestamp(f.time, unit="s", tz="UTC"),
+                "entry": float(entry_price),
+                "exit": float(f.price),
+                "pct": float((f.price / entry_price) - 1.0)
+            })
+
+    # Equity curve (equity starts at 1.0 on the first bar after warmup)
+    eq = np.asarray(eq, dtype="float64")
+    rets = eq / np.concatenate(([1.0], eq[:-1])) - 1.0
+    index = pd.RangeIndex(1, len(eq) + 1)
+    ret_series = pd.Series(rets, index=index)
+    equity = pd.Series(eq, index=index)
+    t = t[len(t) - len(eq) - 1:]  # first ready bar onwards
 
     # Metrics
-    days = (data["time"].iloc[-1] - data["time"].iloc[0]).total_seconds() / 86400.0
+    days = (t[-1] - t[0]) / 86400.0
     years = max(days / 365.25, 1e-9)
     cagr = equity.iloc[-1] ** (1/years) - 1.0
 
@@ -120,7 +89,7 @@ def backtest(df: pd.DataFrame, p: EMAATRParams) -> dict:
     r_mean = ret_series.mean()
     r_std = ret_series.std(ddof=1)
     # infer bars per day from median difference
-    dt = data["time"].diff().dt.total_seconds().median()
+    dt = float(np.median(np.diff(t)))
     bars_per_day = 86400.0 / dt if dt and dt > 0 else 1.0
     sharpe = (r_mean / (r_std + 1e-12)) * np.sqrt(365.0 * bars_per_day)
 
@@ -134,7 +103,7 @@ def backtest(df: pd.DataFrame, p: EMAATRParams) -> dict:
     wr = wins / max(len(trades), 1)
 
     summary = {
-        "bars": int(len(data)),
+        "bars": int(len(t)),
         "trades": int(len(trades)),
         "win_rate": float(wr),
         "cagr": float(cagr),
@@ -0,0 +1,236 @@
+import inspect
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# Feature nodes: `node("ema", span=20)` names a computation; nodes can take
+# other nodes as params (`node("cross_up", a=fast, b=slow)`), forming a
+# dependency graph. A FeatureSet evaluates nodes over NumPy columns of one
+# dataset, computing each distinct node once and memoizing it, so strategies
+# (and parameter sweeps) that share EMAs/ATRs reuse them.
+
+@dataclass(frozen=True)
+class Node:
+    name: str
+    params: Tuple[Tuple[str, object], ...] = ()
+
+    def __repr__(self) -> str:
+        args = ", ".join(f"{k}={v!r}" for k, v in self.params)
+        return f"{self.name}({args})"
+
+def node(name: str, **params) -> Node:
+    """
+    Reference to feature `name` with `params`. Defaults from the feature's
+    signature are filled in, so equal computations get equal (hashable) keys.
+    Names that are not registered features refer to raw dataset columns.
+    """
+    sig = _SIGNATURES.get(name)
+    if sig is None:
+        if params:
+            raise KeyError(f"Unknown feature {name!r}")
+        return Node(name)
+    bound = sig.bind(None, **params)  # None stands in for the FeatureSet
+    bound.apply_defaults()
+    args = dict(bound.arguments)
+    del args[next(iter(sig.parameters))]
+    return Node(name, tuple(sorted(args.items())))
+
+COLUMNS = ("open", "high", "low", "close", "volume")
+CLOSE = Node("close")
+FEATURES: Dict[str, Callable[..., np.ndarray]] = {}
+_SIGNATURES: Dict[str, inspect.Signature] = {}
+
+def feature(name: str):
+    """Register `fn(fs, **params) -> np.ndarray` as feature `name`."""
+    def deco(fn):
+        FEATURES[name] = fn
+        _SIGNATURES[name] = inspect.signature(fn)
+        return fn
+    return deco
+
+class FeatureSet:
+    """
+    Memoized feature evaluation over one dataset: a snapshot of its
+    open/high/low/close/volume columns as float64 arrays. Build one per
+    dataset (e.g. `FeatureSet.from_frame(df)`) and reuse it across strategies
+    or parameter sweeps; later edits to the source frame are not seen, make a
+    new FeatureSet for new data.
+    """
+    def __init__(self, columns: Mapping[str, np.ndarray]):
+        self._columns = columns
+        self._memo: Dict[Node, np.ndarray] = {}
+        self.deps: Dict[Node, set] = {}  # node -> nodes it used (the resolved graph)
+        self._stack: List[Node] = []
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "FeatureSet":
+        """Snapshot (copy) the OHLCV columns of `df`."""
+        return cls({c: df[c].to_numpy(dtype="float64", copy=True) for c in COLUMNS if c in df.columns})
+
+    def __len__(self) -> int:
+        return len(self._columns["close"])
+
+    def __getitem__(self, n: Node) -> np.ndarray:
+        out = self._memo.get(n)
+        if out is None and n.name in FEATURES:
+            n = node(n.name, **dict(n.params))  # normalise a hand-built Node
+            out = self._memo.get(n)
+        if self._stack:
+            self.deps.setdefault(self._stack[-1], set()).add(n)
+        if out is not None:
+            return out
+        fn = FEATURES.get(n.name)
+        if fn is None:
+            if n.params or n.name not in self._columns:
+                raise KeyError(f"Unknown feature or column {n!r}")
+            out = np.asarray(self._columns[n.name], dtype="float64")
+        else:
+            self._stack.append(n)
+            try:
+                out = fn(self, **dict(n.params))
+            finally:
+                self._stack.pop()
+        out.flags.writeable = False  # shared by every consumer of the node
+        self._memo[n] = out
+        return out
+
+    def compute(self, nodes: Mapping[str, Node]) -> Dict[str, np.ndarray]:
+        """Evaluate named nodes in one pass (shared sub-nodes computed once)."""
+        return {name: self[n] for name, n in nodes.items()}
+
+# ---------------------------------------------------------------- primitives
+
+def _ewm(x: np.ndarray, alpha: float) -> np.ndarray:
+    return pd.Series(x, copy=False).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+def _rolling(x: np.ndarray, period: int, how: str) -> np.ndarray:
+    return getattr(pd.Series(x, copy=False).rolling(period), how)().to_numpy()
+
+def _shift1(x: np.ndarray) -> np.ndarray:
+    out = np.empty_like(x, dtype="float64")
+    out[0] = np.nan
+    out[1:] = x[:-1]
+    return out
+
+# ---------------------------------------------------------------- features
+
+@feature("ema")
+def _f_ema(fs: FeatureSet, span: int, of: Node = CLOSE) -> np.ndarray:
+    return _ewm(fs[of], 2.0 / (span + 1.0))
+
+@feature("sma")
+def _f_sma(fs: FeatureSet, period: int, of: Node = CLOSE) -> np.ndarray:
+    return _rolling(fs[of], period, "mean")
+
+@feature("true_range")
+def _f_true_range(fs: FeatureSet) -> np.ndarray:
+    high, low = fs[Node("high")], fs[Node("low")]
+    prev_close = _shift1(fs[CLOSE])
+    # fmax ignores the NaN prev_close on the first bar (= high - low)
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+@feature("atr")
+def _f_atr(fs: FeatureSet, period: int = 14) -> np.ndarray:
+    return _rolling(fs[node("true_range")], period, "mean")
+
+@feature("rsi")
+def _f_rsi(fs: FeatureSet, period: int = 14, of: Node = CLOSE) -> np.ndarray:
+    d = np.diff(fs[of], prepend=np.nan)
+    up, down = np.where(d > 0, d, 0.0), np.where(d < 0, -d, 0.0)
+    up[0] = down[0] = np.nan  # seed the Wilder smoothing at the first change
+    gain, loss = _ewm(up, 1.0 / period), _ewm(down, 1.0 / period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100.0 - 100.0 / (1.0 + gain / loss)
+    flat = loss == 0
+    rsi[flat & (gain > 0)] = 100.0  # only gains
+    rsi[flat & (gain == 0)] = 50.0  # no change at all: neutral, not overbought
+    rsi[:period] = np.nan
+    return rsi
+
+@feature("donchian_high")
+def _f_donchian_high(fs: FeatureSet, period: int = 20) -> np.ndarray:
+    return _rolling(fs[Node("high")], period, "max")
+
+@feature("donchian_low")
+def _f_donchian_low(fs: FeatureSet, period: int = 20) -> np.ndarray:
+    return _rolling(fs[Node("low")], period, "min")
+
+@feature("typical_price")
+def _f_typical_price(fs: FeatureSet) -> np.ndarray:
+    return (fs[Node("high")] + fs[Node("low")] + fs[CLOSE]) / 3.0
+
+@feature("vwap")
+def _f_vwap(fs: FeatureSet, period: int = 20) -> np.ndarray:
+    """Rolling VWAP of typical price; plain rolling mean where volume is 0."""
+    tp, vol = fs[node("typical_price")], fs[Node("volume")]
+    pv = _rolling(tp * vol, period, "sum")
+    v = _rolling(vol, period, "sum")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(v > 0, pv / v, _rolling(tp, period, "mean"))
+
+@feature("cross_up")
+def _f_cross_up(fs: FeatureSet, a: Node, b: Node) -> np.ndarray:
+    x, y = fs[a], fs[b]
+    out = np.zeros(len(x), dtype=bool)
+    out[1:] = (x[1:] > y[1:]) & (x[:-1] <= y[:-1])
+    return out
+
+@feature("cross_down")
+def _f_cross_down(fs: FeatureSet, a: Node, b: Node) -> np.ndarray:
+    x, y = fs[a], fs[b]
+    out = np.zeros(len(x), dtype=bool)
+    out[1:] = (x[1:] < y[1:]) & (x[:-1] >= y[:-1])
+    return out
+
+@feature("breakout_up")
+def _f_breakout_up(fs: FeatureSet, period: int = 20) -> np.ndarray:
+    """Close above the previous bar's Donchian high."""
+    return fs[CLOSE] > _shift1(fs[node("donchian_high", period=period)])
+
+@feature("breakout_down")
+def _f_breakout_down(fs: FeatureSet, period: int = 20) -> np.ndarray:
+    """Close below the previous bar's Donchian low."""
+    return fs[CLOSE] < _shift1(fs[node("donchian_low", period=period)])
+
+@feature("above")
+def _f_above(fs: FeatureSet, a: Node, level: float) -> np.ndarray:
+    return fs[a] > level
+
+@feature("below")
+def _f_below(fs: FeatureSet, a: Node, level: float) -> np.ndarray:
+    return fs[a] < level
+
+# ---------------------------------------------------------------- strategies
+
+@dataclass(frozen=True)
+class Strategy:
+    """A long/flat strategy = boolean entry/exit nodes plus extra columns to report."""
+    name: str
+    entry: Node
+    exit: Node
+    extras: Tuple[Tuple[str, Node], ...] = ()
+
+    def nodes(self) -> Dict[str, Node]:
+        return {**dict(self.extras), "entry_signal": self.entry, "exit_signal": self.exit}
+
+    def signals(self, fs: FeatureSet) -> Dict[str, np.ndarray]:
+        return fs.compute(self.nodes())
+
+def ema_cross(fast: int = 20, slow: int = 50, atr_period: Optional[int] = 14) -> Strategy:
+    f, s = node("ema", span=fast), node("ema", span=slow)
+    extras = (("ema_fast", f), ("ema_slow", s))
+    if atr_period:
+        extras += (("atr", node("atr", period=atr_period)),)
+    return Strategy("ema_cross", node("cross_up", a=f, b=s), node("cross_down", a=f, b=s), extras)
+
+def donchian_breakout(period: int = 20, exit_period: int = 10) -> Strategy:
+    return Strategy("donchian_breakout", node("breakout_up", period=period),
+                    node("breakout_down", period=exit_period),
+                    (("donchian_high", node("donchian_high", period=period)),
+                     ("donchian_low", node("donchian_low", period=exit_period))))
+
+def rsi_reversion(period: int = 14, low: float = 30.0, high: float = 70.0) -> Strategy:
+    rsi = node("rsi", period=period)
+    return Strategy("rsi_reversion", node("below", a=rsi, level=low), node("above", a=rsi, level=high),
+                    (("rsi", rsi),))
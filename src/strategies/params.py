@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass
+class EMAATRParams:
+    fast: int = 20
+    slow: int = 50
+    atr_period: int = 14
+    atr_mult: float = 2.0
+    fee_bps: float = 1.0  # 1 basis point per side (0.01%)
+    warmup_bars: Optional[int] = None  # bars before trading; None = max(fast, slow) + atr_period + 2
+
+    def warmup(self) -> int:
+        """Bars the strategy observes before it may trade (never less than the ATR window)."""
+        n = self.warmup_bars if self.warmup_bars is not None else max(self.fast, self.slow) + self.atr_period + 2
+        return max(n, self.atr_period)
@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+# Robustness of a single backtest path (see ema_atr.backtest output):
+# - block bootstrap of per-bar returns (circular, fixed block length)
+# - trade bootstrap (draw trades with replacement) and trade shuffle
+#   (same trades, random order -> drawdown / ruin only)
+# All resamples are evaluated as batched NumPy ops, `chunk` resamples at a time.
+
+def _ci(x: np.ndarray, ci: float) -> Dict[str, float]:
+    lo, hi = (1.0 - ci) / 2.0, 1.0 - (1.0 - ci) / 2.0
+    q = np.quantile(x, [lo, 0.5, hi])
+    return {"lo": float(q[0]), "median": float(q[1]), "hi": float(q[2]), "mean": float(x.mean())}
+
+def _block_stats(lr: np.ndarray, r: np.ndarray, length: int, max_elems: int) -> Dict[str, np.ndarray]:
+    """
+    Stats of the circular block of `length` bars starting at every index:
+    T total log return, M max / m min of the cumulative log path, D max
+    drawdown (log) inside the block, s1/s2 sums of r and r^2.
+    """
+    n = len(lr)
+    out = {k: np.empty(n) for k in ("T", "M", "m", "D", "s1", "s2")}
+    offs = np.arange(length)
+    step = max(1, max_elems // length)
+    for a in range(0, n, step):
+        idx = (np.arange(a, min(n, a + step))[:, None] + offs) % n
+        c = np.cumsum(lr[idx], axis=1)
+        sl = slice(a, a + len(idx))
+        out["T"][sl] = c[:, -1]
+        out["M"][sl] = c.max(axis=1)
+        out["m"][sl] = c.min(axis=1)
+        peak = np.maximum(np.maximum.accumulate(c, axis=1), 0.0)  # block start counts as a peak
+        out["D"][sl] = (peak - c).max(axis=1)
+        rr = r[idx]
+        out["s1"][sl] = rr.sum(axis=1)
+        out["s2"][sl] = (rr * rr).sum(axis=1)
+    return out
+
+def block_bootstrap(rets: np.ndarray, bars_per_day: float, n_resamples: int = 10_000,
+                    block: Optional[int] = None, seed: Optional[int] = None,
+                    max_elems: int = 20_000_000) -> Dict[str, np.ndarray]:
+    """
+    Circular block bootstrap of per-bar returns. Each resample concatenates
+    random blocks of `block` bars (default ~n^(1/3)) to the original length.
+
+    Instead of materialising (resamples x bars) paths, per-start block stats
+    are precomputed once and composed block by block, so cost scales with
+    resamples x blocks. Returns per-resample arrays: cagr, sharpe, max_drawdown.
+    """
+    r = np.asarray(rets, dtype="float64")
+    n = len(r)
+    if n < 2:
+        raise ValueError("Need at least 2 returns")
+    block = int(block or max(1, round(n ** (1.0 / 3.0))))
+    block = min(block, n)
+    k_full, tail = divmod(n, block)
+    lr = np.log1p(r)
+    full = _block_stats(lr, r, block, max_elems)
+    last = _block_stats(lr, r, tail, max_elems) if tail else None
+    n_blocks = k_full + (1 if tail else 0)
+
+    rng = np.random.default_rng(seed)
+    years = n / (bars_per_day * 365.25)
+    ann = np.sqrt(365.0 * bars_per_day)
+    cagr, sharpe, mdd = (np.empty(n_resamples) for _ in range(3))
+    chunk = max(1, max_elems // n_blocks)
+    for a in range(0, n_resamples, chunk):
+        size = min(chunk, n_resamples - a)
+        starts = rng.integers(0, n, size=(size, n_blocks))
+        cum = np.zeros(size)
+        peak = np.zeros(size)
+        dd = np.zeros(size)
+        s1 = np.zeros(size)
+        s2 = np.zeros(size)
+        for j in range(n_blocks):
+            st = last if (tail and j == n_blocks - 1) else full
+            s = starts[:, j]
+            # drawdown vs the running peak before this block, or inside it
+            np.maximum(dd, peak - (cum + st["m"][s]), out=dd)
+            np.maximum(dd, st["D"][s], out=dd)
+            np.maximum(peak, cum + st["M"][s], out=peak)
+            cum += st["T"][s]
+            s1 += st["s1"][s]
+            s2 += st["s2"][s]
+        sl = slice(a, a + size)
+        cagr[sl] = np.exp(cum / max(years, 1e-9)) - 1.0
+        mean = s1 / n
+        std = np.sqrt(np.maximum(s2 - n * mean * mean, 0.0) / (n - 1))
+        sharpe[sl] = mean / (std + 1e-12) * ann
+        mdd[sl] = np.expm1(-dd)
+    return {"cagr": cagr, "sharpe": sharpe, "max_drawdown": mdd}
+
+def _trade_paths(tr: np.ndarray, idx: np.ndarray, years: float) -> Dict[str, np.ndarray]:
+    c = np.cumsum(np.log1p(tr)[idx], axis=1)
+    peak = np.maximum(np.maximum.accumulate(c, axis=1), 0.0)
+    return {
+        "cagr": np.exp(c[:, -1] / max(years, 1e-9)) - 1.0,
+        "max_drawdown": np.expm1(-(peak - c).max(axis=1)),
+    }
+
+def trade_resample(trade_rets: np.ndarray, years: float, n_resamples: int = 10_000, shuffle: bool = False,
+                   seed: Optional[int] = None, max_elems: int = 20_000_000) -> Dict[str, np.ndarray]:
+    """
+    Resample the sequence of per-trade returns (fees included).
+    shuffle=False: draw trades with replacement (bootstrap).
+    shuffle=True: random permutations; final equity is unchanged, only the
+    path (drawdown) varies.
+    """
+    tr = np.asarray(trade_rets, dtype="float64")
+    m = len(tr)
+    if m == 0:
+        raise ValueError("No trades to resample")
+    rng = np.random.default_rng(seed)
+    out = {"cagr": np.empty(n_resamples), "max_drawdown": np.empty(n_resamples)}
+    chunk = max(1, max_elems // m)
+    for a in range(0, n_resamples, chunk):
+        size = min(chunk, n_resamples - a)
+        if shuffle:
+            idx = rng.random((size, m)).argsort(axis=1)
+        else:
+            idx = rng.integers(0, m, size=(size, m))
+        res = _trade_paths(tr, idx, years)
+        for k in out:
+            out[k][a:a + size] = res[k]
+    return out
+
+def robustness(res: dict, n_resamples: int = 10_000, block: Optional[int] = None, ci: float = 0.95,
+               ruin_dd: float = 0.5, seed: Optional[int] = None) -> dict:
+    """
+    Monte Carlo robustness report for an `ema_atr.backtest` result:
+    confidence intervals for CAGR / Sharpe / max drawdown and risk of ruin
+    (share of resamples whose drawdown reaches `ruin_dd`, e.g. 0.5 = -50%).
+    """
+    summary = res["summary"]
+    bpd = summary["bars_per_day"]
+    rets = pd.Series(res["ret_series"]).to_numpy("float64")
+    years = len(rets) / (bpd * 365.25)
+    fee = summary["params"]["fee_bps"] / 10000.0
+    trade_rets = np.array([(1.0 + t["pct"]) * (1.0 - fee) ** 2 - 1.0 for t in res["trades"]])
+
+    def report(sims: Dict[str, np.ndarray]) -> dict:
+        out = {k: _ci(v, ci) for k, v in sims.items()}
+        out["risk_of_ruin"] = float(np.mean(sims["max_drawdown"] <= -abs(ruin_dd)))
+        return out
+
+    out = {
+        "resamples": n_resamples,
+        "ci": ci,
+        "ruin_dd": ruin_dd,
+        "block_bootstrap": report(block_bootstrap(rets, bpd, n_resamples, block=block, seed=seed)),
+    }
+    if len(trade_rets):
+        out["trade_bootstrap"] = report(trade_resample(trade_rets, years, n_resamples, seed=seed))
+        out["trade_shuffle"] = report(trade_resample(trade_rets, years, n_resamples, shuffle=True, seed=seed))
+    return out
@@ -1,18 +1,42 @@
-from pydantic import BaseModel
-from dotenv import load_dotenv
+from functools import lru_cache
+from typing import TYPE_CHECKING
 import os
 
-load_dotenv()
+if TYPE_CHECKING:
+    from pydantic import BaseModel
 
-class Settings(BaseModel):
-    groq_api_key: str = os.getenv("GROQ_API_KEY", "")
+@lru_cache(maxsize=1)
+def _settings_model():
+    """Define the pydantic Settings model on first use (keeps pydantic off the import path)."""
+    from pydantic import BaseModel, Field
 
-    # Spot (leave empty if not using Spot yet)
-    kraken_key: str = os.getenv("KRAKEN_API_KEY", "")
-    kraken_secret: str = os.getenv("KRAKEN_API_SECRET", "")
+    def _env(name: str):
+        return Field(default_factory=lambda: os.getenv(name, ""))
 
-    # Futures (demo or live)
-    kraken_futures_key: str = os.getenv("KRAKEN_FUTURES_API_KEY", "")
-    kraken_futures_secret: str = os.getenv("KRAKEN_FUTURES_API_SECRET", "")
+    class Settings(BaseModel):
+        groq_api_key: str = _env("GROQ_API_KEY")
 
-settings = Settings()
\ No newline at end of file
+        # Spot (leave empty if not using Spot yet)
+        kraken_key: str = _env("KRAKEN_API_KEY")
+        kraken_secret: str = _env("KRAKEN_API_SECRET")
+
+        # Futures (demo or live)
+        kraken_futures_key: str = _env("KRAKEN_FUTURES_API_KEY")
+        kraken_futures_secret: str = _env("KRAKEN_FUTURES_API_SECRET")
+
+    return Settings
+
+@lru_cache(maxsize=1)
+def get_settings() -> "BaseModel":
+    """Load .env and build Settings on first use (not at import time)."""
+    from dotenv import load_dotenv
+    load_dotenv()
+    return _settings_model()()
+
+def __getattr__(name: str):
+    # Backwards compatible `from src.utils.config import settings` / `Settings`, built lazily.
+    if name == "settings":
+        return get_settings()
+    if name == "Settings":
+        return _settings_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")